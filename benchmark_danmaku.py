@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+弹幕 ASS 排版性能测试
+生成随机弹幕，对比逐行查找的旧实现与当前实现的耗时，并检查不同设置下两者的排版结果是否一致
+用法：python benchmark_danmaku.py [弹幕数量]
+"""
+
+import os
+import sys
+import math
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from utils.config import Config
+from utils.parse.extra.file.danmaku_ass import Json2ASS
+
+class Record:
+    """与 DanmakuRecord 相同的字段，排版只用到其中几个"""
+    __slots__ = ("progress", "mode", "content", "color")
+
+    def __init__(self, progress, mode, content, color):
+        self.progress = progress
+        self.mode = mode
+        self.content = content
+        self.color = color
+
+class LinearJson2ASS(Json2ASS):
+    """旧实现，每条弹幕逐行查找，作为排版结果的参照"""
+    def init_data_table(self):
+        ratio = 0.85 if self.subtitle_obstruct else 1.0
+        ratio = min(ratio, self.area)
+
+        row_count = math.floor(ratio * (self.video_height / self.font_size))
+        rows = {i + 1: None for i in range(row_count)}
+
+        self.data = {i + 1: rows.copy() for i in range(3)}
+
+    def check_row(self, type, new_comment):
+        def set_row(new_row, row):
+            new_row.row = row
+            self.data.get(type)[row] = new_row
+            return new_row
+
+        def check_normal_comment():
+            for row, previous_comment in self.data.get(type).items():
+                if previous_comment:
+                    previous_speed = math.ceil((previous_comment.width + self.video_width) / (previous_comment.end_time - previous_comment.start_time))
+
+                    if self.density == 3:
+                        previous_shown_time = new_comment.start_time
+                    else:
+                        previous_shown_time = (previous_comment.start_time + previous_comment.width / previous_speed) + self.density
+
+                    if new_comment.start_time >= previous_shown_time:
+                        duration = max((new_comment.width + self.video_width) / previous_speed, self.scroll_duration)
+                        distance = math.ceil((new_comment.start_time - previous_comment.start_time) * previous_speed)
+
+                        ratio = distance / self.video_width
+                        offset = 0.3 - 0.2 * math.exp(-2.77 * ratio)
+
+                        duration -= offset
+
+                        new_comment.end_time = new_comment.start_time + duration
+
+                        return set_row(new_comment, row)
+                else:
+                    return set_row(new_comment, row)
+
+        def check_top_comment():
+            for row, previous_comment in self.data.get(type).items():
+                if previous_comment:
+                    if new_comment.start_time >= (previous_comment.end_time + self.density):
+                        return set_row(new_comment, row)
+                else:
+                    return set_row(new_comment, row)
+
+        def check_bottom_comment():
+            for row, previous_comment in reversed(list(self.data.get(2).items())):
+                if previous_comment:
+                    if new_comment.start_time >= (previous_comment.end_time + self.density):
+                        return set_row(new_comment, row)
+                else:
+                    return set_row(new_comment, row)
+
+        match type:
+            case 1:
+                return check_normal_comment()
+            case 2:
+                return check_top_comment()
+            case 3:
+                return check_bottom_comment()
+
+def generate_records(count, duration = 3 * 3600, seed = 23):
+    """生成按出现时间排序的随机弹幕，默认为 3 小时视频"""
+    rnd = random.Random(seed)
+
+    records = []
+    for index in range(count):
+        progress = rnd.randrange(1, duration * 1000)
+        mode = rnd.choices([1, 4, 5], weights = [8, 1, 1])[0]
+        content = "弹" * rnd.randint(2, 20)
+        color = rnd.choice([16777215, 16777215, 16711680, 65280])
+
+        records.append(Record(progress, mode, content, color))
+
+    records.sort(key = lambda record: record.progress)
+
+    return records
+
+def run(cls, records, width = 1920, height = 1080):
+    start = time.perf_counter()
+
+    dialogue_list = list(cls(width, height).get_dialogue_list(records))
+
+    return dialogue_list, time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    danmaku_style = Config.Basic.ass_style.get("danmaku")
+    original_style = danmaku_style.copy()
+
+    try:
+        # 不同的密度、显示区域、速度和防遮挡设置下，排版结果必须一致
+        check_records = generate_records(min(count, 20000))
+
+        for density in (0, 1, 2):
+            for area in (1, 3, 5):
+                for speed in (1, 3, 5):
+                    for subtitle_obstruct in (False, True):
+                        danmaku_style.update(density = density, area = area, speed = speed, subtitle_obstruct = subtitle_obstruct)
+
+                        if run(LinearJson2ASS, check_records)[0] != run(Json2ASS, check_records)[0]:
+                            print(f"排版结果不一致：density = {density}, area = {area}, speed = {speed}, subtitle_obstruct = {subtitle_obstruct}")
+                            sys.exit(1)
+
+        print("排版结果一致")
+
+        danmaku_style.update(original_style)
+
+        records = generate_records(count)
+
+        linear_result, linear_time = run(LinearJson2ASS, records)
+        result, elapsed_time = run(Json2ASS, records)
+
+        if linear_result != result:
+            print("排版结果不一致")
+            sys.exit(1)
+
+        print(f"弹幕数量：{count}，输出条目：{len(result)}")
+        print(f"逐行查找：{linear_time:.2f}s")
+        print(f"当前实现：{elapsed_time:.2f}s（{linear_time / elapsed_time:.1f}x）")
+
+    finally:
+        danmaku_style.clear()
+        danmaku_style.update(original_style)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import wx
+import gettext
+
+from gui.id import ID
+
+_ = gettext.gettext
+
+class DownloadItemMenu(wx.Menu):
+    def __init__(self, priority: int):
+        wx.Menu.__init__(self)
+
+        priority_menuitem = wx.MenuItem(self, ID.DOWNLOAD_ITEM_PRIORITY_MENU, _("取消优先下载(&P)") if priority else _("优先下载(&P)"))
+
+        self.Append(priority_menuitem)
@@ -4,6 +4,9 @@ import wx.adv
 
 from utils.common.style.icon_v4 import Icon, IconID
 from utils.config import Config
+from utils.common.io.task_writer import TaskWriter
+
+from utils.module.web.cdn_score import CDNScoreboard
 
 class TaskBarIcon(wx.adv.TaskBarIcon):
     def __init__(self):
@@ -48,6 +51,10 @@ class TaskBarIcon(wx.adv.TaskBarIcon):
                 self.switch_window(main_window.download_window)
 
             case self.ID_EXIT_MENU:
+                TaskWriter.stop()
+
+                CDNScoreboard.save(force = True)
+
                 sys.exit()
     
     def switch_window(self, frame: wx.Frame):
@@ -0,0 +1,151 @@
+import wx
+import math
+from typing import Callable, List
+
+from gui.component.panel.scrolled_panel_list import EmptyItemPanel
+from gui.component.panel.panel import Panel
+
+class VirtualPanelList(Panel):
+    # 虚拟列表，只创建可见区域所需数量的行控件，滚动时将行控件重新绑定到对应的数据项
+    # 行控件需实现 bind(item) 和 unbind() 方法
+    def __init__(self, parent, info: dict):
+        self.info = info
+
+        Panel.__init__(self, parent)
+
+        self.SetDoubleBuffered(True)
+
+        self.init_UI()
+
+        self.Bind_EVT()
+
+        self.init_utils()
+
+    def init_UI(self):
+        self.list_panel = Panel(self)
+
+        self.list_vbox = wx.BoxSizer(wx.VERTICAL)
+
+        self.empty_panel = EmptyItemPanel(self.list_panel, self.info.get("empty_label"), "empty_panel")
+
+        self.list_vbox.Add(self.empty_panel, 1, wx.EXPAND)
+
+        self.list_panel.SetSizer(self.list_vbox)
+
+        self.scrollbar = wx.ScrollBar(self, -1, style = wx.SB_VERTICAL)
+        self.scrollbar.Hide()
+
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        hbox.Add(self.list_panel, 1, wx.EXPAND)
+        hbox.Add(self.scrollbar, 0, wx.EXPAND)
+
+        self.SetSizer(hbox)
+
+    def Bind_EVT(self):
+        self.list_panel.Bind(wx.EVT_SIZE, self.onSizeEVT)
+
+        self.scrollbar.Bind(wx.EVT_SCROLL, self.onScrollEVT)
+
+        self.bind_mousewheel(self.list_panel)
+
+    def init_utils(self):
+        # 当前显示的第一行在数据中的序号
+        self.first = 0
+        self.row_height = 0
+
+        self.panel_list: List[wx.Window] = []
+
+        self.get_count: Callable = self.info.get("get_count")
+        self.get_item: Callable = self.info.get("get_item")
+        self.create_panel: Callable = self.info.get("create_panel")
+
+    def set_dark_mode(self):
+        super().set_dark_mode()
+
+        self.list_panel.set_dark_mode()
+        self.empty_panel.set_dark_mode()
+
+    def onSizeEVT(self, event: wx.SizeEvent):
+        event.Skip()
+
+        wx.CallAfter(self.RefreshItems)
+
+    def onScrollEVT(self, event: wx.ScrollEvent):
+        self.ScrollTo(self.scrollbar.GetThumbPosition())
+
+    def onMouseWheelEVT(self, event: wx.MouseEvent):
+        # 每格滚动一行
+        if rows := -round(event.GetWheelRotation() / event.GetWheelDelta()):
+            self.ScrollTo(self.first + rows)
+
+    def ScrollTo(self, first: int):
+        if first != self.first:
+            self.first = first
+
+            self.RefreshItems()
+
+    def RefreshItems(self):
+        # 数据变化、滚动或大小变化时调用，只重新绑定可见的行
+        count = self.get_count()
+
+        self.Freeze()
+
+        self.ensure_panels(count)
+
+        visible_count = self.get_visible_count()
+
+        self.first = max(0, min(self.first, count - visible_count))
+
+        for offset, panel in enumerate(self.panel_list):
+            index = self.first + offset
+
+            item = self.get_item(index) if index < count and offset < visible_count + 1 else None
+
+            if item:
+                panel.bind(item)
+            else:
+                panel.unbind()
+
+            panel.Show(bool(item))
+
+        self.empty_panel.Show(count == 0)
+
+        self.scrollbar.SetScrollbar(self.first, visible_count, count, visible_count)
+        self.scrollbar.Show(count > visible_count)
+
+        self.Layout()
+        self.list_panel.Layout()
+
+        self.Thaw()
+
+    def ensure_panels(self, count: int):
+        # 行控件数量只与可见区域的高度有关，与数据总数无关
+        if count and not self.panel_list:
+            self.add_panel()
+
+            self.row_height = self.panel_list[0].GetBestSize().height
+
+        while len(self.panel_list) < min(count, self.get_visible_count() + 1):
+            self.add_panel()
+
+    def add_panel(self):
+        panel = self.create_panel(self.list_panel)
+
+        self.list_vbox.Add(panel, 0, wx.EXPAND)
+
+        self.bind_mousewheel(panel)
+
+        self.panel_list.append(panel)
+
+    def bind_mousewheel(self, window: wx.Window):
+        # 滚轮事件不会传递给父窗口，需要绑定到每个子控件上
+        window.Bind(wx.EVT_MOUSEWHEEL, self.onMouseWheelEVT)
+
+        for child in window.GetChildren():
+            self.bind_mousewheel(child)
+
+    def get_visible_count(self):
+        if not self.row_height:
+            return 1
+
+        return max(1, math.floor(self.list_panel.GetClientSize().height / self.row_height))
@@ -62,6 +62,13 @@ class StaticBitmap(Panel):
 
         self.Refresh()
 
+    def ClearBitmap(self):
+        self.image = None
+
+        self.Unbind(wx.EVT_PAINT)
+
+        self.Refresh()
+
     def SetTextTip(self, text: list):
         self.text = text
 
@@ -32,6 +32,8 @@ class ID:
     EPISODE_LIST_SELECT_BATCH_MENU = wx.NewIdRef()
     EPISODE_LIST_REFRESH_MEDIA_INFO_MENU = wx.NewIdRef()
 
+    DOWNLOAD_ITEM_PRIORITY_MENU = wx.NewIdRef()
+
     SUPPORTTED_URL_MENU = wx.NewIdRef()
     HISTORY_MENU = wx.NewIdRef()
 
@@ -1,5 +1,7 @@
 import wx
 
+from utils.common.request import RequestUtils
+
 from utils.module.web.ws import WebSocketServer
 
 from gui.component.window.frame import Frame
@@ -37,6 +39,8 @@ class DebugWindow(Frame):
         ws_hbox.Add(self.start_ws_btn, 0, wx.ALL, self.FromDIP(6))
         ws_hbox.Add(self.stop_ws_btn, 0, wx.ALL & (~wx.LEFT), self.FromDIP(6))
 
+        self.pool_stats_btn = wx.Button(panel, -1, "Show Connection Pool Stats")
+
         parse_info = wx.StaticText(panel, -1, "查看当前 ParseInfo")
 
         self.info_list = wx.ListCtrl(panel, -1, style = wx.LC_REPORT)
@@ -44,6 +48,7 @@ class DebugWindow(Frame):
         vbox = wx.BoxSizer(wx.VERTICAL)
         vbox.Add(enable_hbox, 0, wx.EXPAND)
         vbox.Add(ws_hbox, 0, wx.EXPAND)
+        vbox.Add(self.pool_stats_btn, 0, wx.ALL & (~wx.TOP), self.FromDIP(6))
         vbox.Add(parse_info, 0, wx.ALL, 10)
         vbox.Add(self.info_list, 0, wx.ALL & (~wx.TOP), 10)
 
@@ -59,6 +64,8 @@ class DebugWindow(Frame):
         self.start_ws_btn.Bind(wx.EVT_BUTTON, self.onStartWSEVT)
         self.stop_ws_btn.Bind(wx.EVT_BUTTON, self.onStopWSEVT)
 
+        self.pool_stats_btn.Bind(wx.EVT_BUTTON, self.onShowPoolStatsEVT)
+
     def onEnableEpisodeListEVT(self, event):
         self.parent.episode_option_btn.Enable(self.enable_episode_list_chk.GetValue())
 
@@ -71,6 +78,17 @@ class DebugWindow(Frame):
     def onStopWSEVT(self, event):
         self.websocket_server.stop()
 
+    def onShowPoolStatsEVT(self, event):
+        lines = []
+
+        for name, stats_list in RequestUtils.get_pool_stats().items():
+            lines.append(f"[{name}]")
+
+            for entry in stats_list:
+                lines.append(f"{entry['host']}: in use {entry['in_use']}/{entry['max_size']}, idle {entry['idle']}, created {entry['created']}, requests {entry['requests']}")
+
+        wx.MessageDialog(self, "\n".join(lines), "Connection Pool Stats", wx.ICON_INFORMATION).ShowModal()
+
     def get_window_style(self):
         style = wx.DEFAULT_FRAME_STYLE
 
@@ -1,5 +1,4 @@
 import wx
-import os
 import gettext
 from typing import List, Callable
 
@@ -8,14 +7,15 @@ from utils.config import Config
 from utils.common.enums import Platform, NumberType, DownloadStatus
 from utils.common.style.icon_v4 import Icon, IconID
 from utils.common.io.directory import Directory
-from utils.common.model.task_info import DownloadTaskInfo
+from utils.common.io.task_store import TaskStore
+from utils.common.model.task_info import DownloadTaskInfo, TaskIndexEntry
 from utils.common.thread import Thread
 from utils.common.datetime_util import DateTime
 
 from utils.module.notification import NotificationManager
 
 from gui.window.download.page import DownloadingPage, CompletedPage
-from gui.window.download.item_panel_v4 import DownloadTaskItemPanel
+from gui.window.download.item_utils import Utils as TaskItemUtils
 
 from gui.component.button.action_button import ActionButton
 from gui.component.window.frame import Frame
@@ -180,21 +180,17 @@ class RightPanel(Panel):
     def change_page(self, index: 0):
         self.book.SetSelection(index)
     
-    def ShowDownloadingItemList(self, download_list: List[DownloadTaskInfo], callback: Callable = None, max_limit = False):
-        self.downloading_page.scroller.info_list.extend(download_list)
+    def ShowDownloadingItemList(self, download_list: List[DownloadTaskInfo | TaskIndexEntry], callback: Callable = None):
+        self.downloading_page.ShowItems(download_list, callback)
 
-        self.downloading_page.ShowItems(callback, max_limit = max_limit)
+    def ShowCompletedItemList(self, download_list: List[DownloadTaskInfo | TaskIndexEntry | TaskItemUtils]):
+        self.completed_page.ShowItems(download_list)
 
-    def ShowCompletedItemList(self, download_list: List[DownloadTaskInfo], max_limit: bool = False):
-        self.completed_page.scroller.info_list.extend(download_list)
-
-        self.completed_page.ShowItems(max_limit = max_limit)
-
-    def move_to_completed_page(self, task_info: DownloadTaskInfo):
+    def move_to_completed_page(self, item: TaskItemUtils):
         def worker():
-            task_info.source = "下载完成"
+            item.task_info.source = "下载完成"
 
-            self.ShowCompletedItemList([task_info], max_limit = True)
+            self.ShowCompletedItemList([item])
 
             self.parent.top_panel.UpdateAllTitle(self.parent.left_panel.GetTotalCompletedCount(), "下载完成")
 
@@ -233,7 +229,9 @@ class Utils:
 
             update_index()
 
-            entry.update()
+            entry.min_version = Config.APP.task_file_min_version_code
+
+        TaskStore.save_many([entry.to_dict() for entry in download_list])
 
     @staticmethod
     def get_timestamp(index):
@@ -241,26 +239,28 @@ class Utils:
 
     @classmethod
     def read_download_files(cls):
-        temp_task_info_list: List[DownloadTaskInfo] = []
+        temp_task_info_list: List[TaskIndexEntry] = []
+        invalid_id_list: List[int] = []
 
-        for file_name in os.listdir(Config.User.task_file_directory):
-            file_path = os.path.join(Config.User.task_file_directory, file_name)
+        TaskStore.migrate()
 
-            if file_name.startswith("info_") and file_name.endswith(".json"):
-                task_info = DownloadTaskInfo()
-                task_info.load_from_file(file_path)
+        # 只读取索引，完整的任务信息在显示时再加载
+        for row in TaskStore.load_index():
+            entry = TaskIndexEntry(row)
 
-                if task_info.is_valid():
-                    temp_task_info_list.append(task_info)
-                else:
-                    task_info.remove_file()
+            if entry.is_valid():
+                temp_task_info_list.append(entry)
+            else:
+                invalid_id_list.append(entry.id)
+
+        TaskStore.remove_many(invalid_id_list)
 
         return cls.task_info_filter(temp_task_info_list)
 
     @staticmethod
-    def task_info_filter(task_info_list: List[DownloadTaskInfo]):
-        temp_downloading_list: List[DownloadTaskInfo] = []
-        temp_completed_list: List[DownloadTaskInfo] = []
+    def task_info_filter(task_info_list: List[TaskIndexEntry]):
+        temp_downloading_list: List[TaskIndexEntry] = []
+        temp_completed_list: List[TaskIndexEntry] = []
 
         for task_info in task_info_list:
             if DownloadStatus(task_info.status) == DownloadStatus.Complete:
@@ -276,17 +276,6 @@ class Utils:
 
         return temp_downloading_list, temp_completed_list
 
-    @staticmethod
-    def get_hash_id_list():
-        hash_id_list: List[str] = []
-
-        window: DownloadManagerWindow = wx.FindWindowByName("download")
-
-        hash_id_list.extend(window.right_panel.downloading_page.hash_id_list)
-        hash_id_list.extend(window.right_panel.completed_page.hash_id_list)
-
-        return hash_id_list
-
 class DownloadManagerWindow(Frame):
     def __init__(self, parent):
         Frame.__init__(self, parent, _("下载管理"), style = self.get_window_style(), name = "download")
@@ -352,7 +341,7 @@ class DownloadManagerWindow(Frame):
         if create_local_file:
             Utils.create_download_file(download_list)
 
-        wx.CallAfter(self.right_panel.ShowDownloadingItemList, download_list, get_after_show_items_callback, True)
+        wx.CallAfter(self.right_panel.ShowDownloadingItemList, download_list, get_after_show_items_callback)
 
     def add_to_completed_list(self, completed_list: List[DownloadTaskInfo]):
         wx.CallAfter(self.right_panel.ShowCompletedItemList, completed_list)
@@ -364,31 +353,14 @@ class DownloadManagerWindow(Frame):
 
         self.top_panel.UpdateAllTitle(count, source)
 
-        page.scroller.Layout()
-
         if count == 0 and source == "正在下载" and not user_action and Config.Download.enable_notification:
             notification = NotificationManager(self)
             notification.show_toast(_("下载完成"), _("所有任务已下载完成"), flags = wx.ICON_INFORMATION)
 
-    def remove_item(self, source: str):
+    def remove_item(self, source: str, item: TaskItemUtils):
         page = self.get_page(source)
 
-        page.scroller.Remove()
-
-    def start_next_task(self):
-        self.load_next_task("正在下载", self.right_panel.downloading_page.start_download)
-    
-    def load_next_task(self, source: str, callback: Callable = None):
-        def worker():
-            page.ShowItems(callback, load_items = 1)
-
-        page = self.get_page(source)
-
-        if page.is_need_load_more():
-            wx.CallAfter(worker)
-
-        if callback:
-            callback()
+        page.RemoveItem(item)
 
     def adjust_download_item_count(self, selection: int):
         self.right_panel.downloading_page.max_download_choice.SetSelection(selection)
@@ -396,17 +368,16 @@ class DownloadManagerWindow(Frame):
         self.right_panel.downloading_page.start_download()
 
     def find_duplicate_task(self, download_task_list: List[DownloadTaskInfo]):
-        to_download_hash_id_list = [entry.hash_id for entry in download_task_list]
-        existing_hash_id_list = Utils.get_hash_id_list()
+        duplicate_hash_id_set = TaskStore.find_hash_ids([entry.hash_id for entry in download_task_list])
 
-        duplicate_hash_id_list = list(set(to_download_hash_id_list) & set(existing_hash_id_list))
-
-        duplicate_task_info_list = [entry for entry in download_task_list if entry.hash_id in duplicate_hash_id_list]
+        duplicate_task_info_list = [entry for entry in download_task_list if entry.hash_id in duplicate_hash_id_set]
 
         return duplicate_task_info_list
     
     def remove_duplicate_task(self, download_task_list: List[DownloadTaskInfo], duplicate_hash_id_list: List[str]):
-        return [entry for entry in download_task_list if entry.hash_id not in duplicate_hash_id_list]
+        duplicate_hash_id_set = set(duplicate_hash_id_list)
+
+        return [entry for entry in download_task_list if entry.hash_id not in duplicate_hash_id_set]
 
     def set_window_params(self):
         match Platform(Config.Sys.platform):
@@ -2,27 +2,30 @@ import wx
 import gettext
 
 from utils.config import Config
-from utils.common.model.task_info import DownloadTaskInfo
 from utils.common.style.icon_v4 import Icon, IconID
 from utils.common.enums import Platform, DownloadStatus
 
 from utils.module.pic.cover import Cover
 
 from gui.dialog.error import ErrorInfoDialog
+from gui.id import ID
 
 from gui.component.panel.panel import Panel
 from gui.component.staticbitmap.staticbitmap import StaticBitmap
 from gui.component.label.info_label import InfoLabel
 from gui.component.button.bitmap_button import BitmapButton
+from gui.component.menu.download_item import DownloadItemMenu
 
 _ = gettext.gettext
 
 class DownloadTaskItemPanel(Panel):
-    def __init__(self, parent: wx.Window, task_info: DownloadTaskInfo, download_window: wx.Window):
+    # 列表中的行控件，可重复使用，滚动时通过 bind 绑定到不同的任务
+    def __init__(self, parent: wx.Window, download_window: wx.Window):
         from gui.window.download.download_v4 import DownloadManagerWindow
+        from gui.window.download.item_utils import Utils
 
-        self.task_info = task_info
         self.download_window: DownloadManagerWindow = download_window
+        self.utils: Utils = None
 
         Panel.__init__(self, parent)
 
@@ -30,8 +33,6 @@ class DownloadTaskItemPanel(Panel):
 
         self.Bind_EVT()
 
-        self.init_utils()
-
     def init_UI(self):
         self.set_dark_mode()
 
@@ -97,9 +98,11 @@ class DownloadTaskItemPanel(Panel):
         self.panel_vbox.Add(bottom_border, 0, wx.EXPAND)
 
         self.SetSizer(self.panel_vbox)
-    
+
     def Bind_EVT(self):
         self.Bind(wx.EVT_WINDOW_DESTROY, self.onDestroyEVT)
+        self.Bind(wx.EVT_CONTEXT_MENU, self.onContextMenuEVT)
+        self.Bind(wx.EVT_MENU, self.onMenuEVT)
 
         self.cover_bmp.Bind(wx.EVT_LEFT_DOWN, self.onCoverEVT)
         self.speed_lab.Bind(wx.EVT_LEFT_DOWN, self.onErrorDialogEVT)
@@ -107,19 +110,37 @@ class DownloadTaskItemPanel(Panel):
         self.pause_btn.Bind(wx.EVT_BUTTON, self.onPauseEVT)
         self.stop_btn.Bind(wx.EVT_BUTTON, self.onStopEVT)
 
-    def init_utils(self):
-        from gui.window.download.item_utils import Utils
-        
-        self.utils = Utils(self, self.task_info)
+    def bind(self, utils):
+        if utils is not self.utils:
+            self.unbind()
+
+            self.utils = utils
+
+            self.utils.bind_panel(self)
 
-        self.panel_destroy = False
-        self.show_info = False
+    def unbind(self):
+        if self.utils:
+            self.utils.unbind_panel(self)
+
+            self.utils = None
 
     def onDestroyEVT(self, event: wx.CommandEvent):
-        self.panel_destroy = True
+        self.unbind()
 
         event.Skip()
 
+    def onContextMenuEVT(self, event: wx.ContextMenuEvent):
+        # 下载完成的任务不再参与调度
+        if self.utils and self.task_info.status != DownloadStatus.Complete.value:
+            menu = DownloadItemMenu(self.task_info.priority)
+
+            self.PopupMenu(menu)
+
+    def onMenuEVT(self, event: wx.CommandEvent):
+        match event.GetId():
+            case ID.DOWNLOAD_ITEM_PRIORITY_MENU:
+                self.utils.set_priority(0 if self.task_info.priority else 1)
+
     def onCoverEVT(self, event: wx.MouseEvent):
         Cover.view_cover(self.download_window, self.task_info.cover_url)
 
@@ -149,12 +170,16 @@ class DownloadTaskItemPanel(Panel):
                 self.utils.start_download()
 
     def onStopEVT(self, event: wx.CommandEvent):
-        self.utils.destroy_panel(remove_file = True, user_action = True)
+        self.utils.remove_task(remove_file = True, user_action = True)
 
     def get_progress_bar_size(self):
         match Platform(Config.Sys.platform):
             case Platform.Windows | Platform.macOS:
                 return self.FromDIP((196, 16))
-            
+
             case Platform.Linux:
-                return self.FromDIP((196, 4))
\ No newline at end of file
+                return self.FromDIP((196, 4))
+
+    @property
+    def task_info(self):
+        return self.utils.task_info
@@ -2,6 +2,7 @@ import wx
 import os
 import time
 import gettext
+from collections import OrderedDict
 
 from utils.config import Config
 
@@ -19,6 +20,7 @@ from utils.common.io.file import File
 
 from utils.module.pic.cover import Cover
 from utils.module.downloader_v3 import Downloader
+from utils.module.scheduler import DownloadScheduler
 from utils.module.ffmpeg.utils import FFUtils
 
 from utils.parse.download import DownloadParser
@@ -30,21 +32,21 @@ _ = gettext.gettext
 
 class Utils:
     class UI:
-        def __init__(self, parent: wx.Window):
-            self.parent: DownloadTaskItemPanel = parent
+        def __init__(self):
+            # 当前绑定的行控件，不在可见区域时为 None
+            self.parent: DownloadTaskItemPanel = None
 
-        def show_cover(self, cover_url: str):
-            def worker():
-                self.parent.cover_bmp.SetBitmap(bitmap)
+        def is_bound(self):
+            return self.parent is not None
 
-            if not self.parent.panel_destroy:
-                size = self.parent.cover_bmp.GetSize()
+        def set_cover(self, bitmap: wx.Bitmap):
+            self.parent.cover_bmp.SetBitmap(bitmap)
 
-                image = Cover.crop_cover(Cover.get_cover_raw_contents(cover_url))
+        def clear_cover(self):
+            self.parent.cover_bmp.ClearBitmap()
 
-                bitmap = Cover.get_scaled_bitmap_from_image(image, size)
-
-                wx.CallAfter(worker)
+        def get_cover_size(self):
+            return self.parent.cover_bmp.GetSize()
 
         def set_title(self, title: str):
             self.parent.title_lab.SetLabel(title)
@@ -128,14 +130,37 @@ class Utils:
             else:
                 return _("转换音频失败，点击查看详情")
 
-    def __init__(self, parent: wx.Window, task_info: DownloadTaskInfo):
-        self.parent: DownloadTaskItemPanel = parent
+    # 最近显示过的封面，滚动回来时不必重新下载
+    cover_cache: "OrderedDict[str, wx.Bitmap]" = OrderedDict()
+    cover_cache_size = 200
+
+    def __init__(self, download_window: wx.Window, task_info: DownloadTaskInfo):
+        from gui.window.download.download_v4 import DownloadManagerWindow
+
+        self.download_window: DownloadManagerWindow = download_window
         self.task_info = task_info
 
-        self.ui = self.UI(parent)
+        self.ui = self.UI()
         self.info = self.Info(task_info)
 
+        self.show_info = False
+        self.cover_loading = False
+
+    def bind_panel(self, panel: DownloadTaskItemPanel):
+        self.ui.parent = panel
+
+        self.show_task_info()
+        self.show_cover()
+
+    def unbind_panel(self, panel: DownloadTaskItemPanel):
+        # 行控件可能已重新绑定到其他列表中的同一任务
+        if self.ui.parent is panel:
+            self.ui.parent = None
+
     def show_task_info(self):
+        if not self.ui.is_bound():
+            return
+
         self.ui.set_title(self.task_info.title)
         self.ui.set_progress(self.task_info.progress)
 
@@ -143,39 +168,65 @@ class Utils:
         self.ui.set_codec_label(self.info.get_codec_label())
         self.ui.set_size_label(self.info.get_size_label())
 
-        self.set_download_status(DownloadStatus(self.task_info.status))
-
-        self.ui.update()
+        # 仅刷新显示，绑定行控件时不需要重新写入任务
+        self.update_pause_btn(self.task_info.status)
 
     def show_cover(self):
-        self.ui.show_cover(f"{self.task_info.cover_url}@.jpeg")
+        def worker():
+            image = Cover.crop_cover(Cover.get_cover_raw_contents(cover_url))
 
-    def destroy_panel(self, remove_file: bool = False, user_action: bool = False):
-        if hasattr(self, "downloader"):
-            self.downloader.stop_download()
+            wx.CallAfter(set_cover, Cover.get_scaled_bitmap_from_image(image, size))
+
+        def set_cover(bitmap: wx.Bitmap):
+            self.cover_loading = False
+
+            self.add_cover_cache(cover_url, bitmap)
+
+            if self.ui.is_bound():
+                self.ui.set_cover(bitmap)
+
+        cover_url = f"{self.task_info.cover_url}@.jpeg"
+
+        if bitmap := self.get_cover_cache(cover_url):
+            self.ui.set_cover(bitmap)
+        else:
+            self.ui.clear_cover()
+
+            if not self.cover_loading:
+                self.cover_loading = True
+
+                size = self.ui.get_cover_size()
+
+                Thread(target = worker).start()
+
+    def remove_task(self, remove_file: bool = False, user_action: bool = False):
+        self.release()
 
         if remove_file:
             self.task_info.remove_file()
 
-        self.clear_temp_files()
+        self.download_window.remove_item(self.task_info.source, self)
+        self.download_window.update_title(self.task_info.source, user_action)
 
-        self.parent.Destroy()
+    def release(self):
+        DownloadScheduler.remove(self.task_info.id)
 
-        self.parent.download_window.update_title(self.task_info.source, user_action)
-        self.parent.download_window.remove_item(self.task_info.source)
+        if hasattr(self, "downloader"):
+            self.downloader.stop_download()
 
-        if user_action:
-            self.parent.download_window.load_next_task(self.task_info.source)
+        self.clear_temp_files()
 
-    def move_panel(self):
+    def move_to_completed(self):
         def worker():
-            self.destroy_panel(remove_file = False)
+            self.remove_task(remove_file = False)
 
-            self.parent.download_window.right_panel.move_to_completed_page(self.task_info)
+            self.download_window.right_panel.move_to_completed_page(self)
 
         wx.CallAfter(worker)
 
     def start_download(self):
+        DownloadScheduler.mark_running(self.task_info.id)
+
         self.set_download_status(DownloadStatus.Downloading)
 
         match ParseType(self.task_info.download_type):
@@ -206,6 +257,14 @@ class Utils:
         if hasattr(self, "downloader"):
             self.downloader.stop_download()
 
+        DownloadScheduler.remove(self.task_info.id)
+
+    def set_priority(self, priority: int):
+        self.task_info.priority = priority
+        self.task_info.update()
+
+        DownloadScheduler.set_priority(self.task_info.id, priority)
+
     def resume_download(self):
         if self.task_info.status != DownloadStatus.Downloading.value:
             if self.task_info.progress == 100:
@@ -232,15 +291,19 @@ class Utils:
 
     def onDownloadStart(self):
         def worker():
-            self.parent.show_info = True
+            self.show_info = True
 
             self.show_task_info()
 
-        if not self.parent.panel_destroy and not self.parent.show_info:
+        if not self.show_info:
             wx.CallAfter(worker)
 
     def onDownloading(self, speed_label: str):
         def worker():
+            # 不在可见区域时只更新任务信息，不刷新界面
+            if not self.ui.is_bound():
+                return
+
             self.ui.set_progress(self.task_info.progress)
 
             self.ui.set_speed_label(speed_label)
@@ -248,20 +311,23 @@ class Utils:
 
             self.ui.update()
 
-        if not self.parent.panel_destroy:
-            wx.CallAfter(worker)
+        wx.CallAfter(worker)
 
     def onDownloadVideoComplete(self):
         def worker():
+            if not self.ui.is_bound():
+                return
+
             self.ui.set_size_label(self.info.get_size_label())
 
             self.ui.update()
 
+        # 下载阶段已结束，合并不占用下载位置
+        DownloadScheduler.remove(self.task_info.id)
+
         if self.task_info.further_processing:
             self.set_download_status(DownloadStatus.Merging)
 
-            self.parent.download_window.start_next_task()
-
             if self.task_info.ffmpeg_merge:
                 self.merge_video(set_status = False)
             else:
@@ -274,14 +340,14 @@ class Utils:
 
         self.set_download_status(DownloadStatus.DownloadError)
 
-        self.parent.download_window.start_next_task()
+        DownloadScheduler.remove(self.task_info.id)
     
     def onMergeSuccess(self):
         def worker():
-            self.move_panel()
+            self.move_to_completed()
 
         self.task_info.status = DownloadStatus.Complete.value
-        self.task_info.update()
+        self.task_info.update(force = True)
 
         wx.CallAfter(worker)
 
@@ -295,7 +361,7 @@ class Utils:
 
         self.onMergeSuccess()
         
-        self.parent.download_window.start_next_task()
+        DownloadScheduler.remove(self.task_info.id)
 
     def clear_temp_files(self):
         if ParseType(self.task_info.download_type) in [ParseType.Video, ParseType.Bangumi, ParseType.Cheese]:
@@ -310,13 +376,17 @@ class Utils:
         def worker():
             self.update_pause_btn(status)
 
-            self.task_info.update()
+            # 暂停、完成和出错时立即写入，其余状态变化延迟批量写入
+            self.task_info.update(force = status in [DownloadStatus.Pause, DownloadStatus.Complete, DownloadStatus.MergeError, DownloadStatus.DownloadError])
 
         self.task_info.status = status.value
 
         wx.CallAfter(worker)
 
     def update_pause_btn(self, status: int):
+        if not self.ui.is_bound():
+            return
+
         match DownloadStatus(status):
             case DownloadStatus.Waiting:
                 self.ui.set_pause_btn(IconID.Play, _("开始下载"))
@@ -348,6 +418,20 @@ class Utils:
 
         self.ui.update()
 
+    @classmethod
+    def get_cover_cache(cls, cover_url: str):
+        if bitmap := cls.cover_cache.get(cover_url):
+            cls.cover_cache.move_to_end(cover_url)
+
+        return bitmap
+
+    @classmethod
+    def add_cover_cache(cls, cover_url: str, bitmap: wx.Bitmap):
+        cls.cover_cache[cover_url] = bitmap
+
+        if len(cls.cover_cache) > cls.cover_cache_size:
+            cls.cover_cache.popitem(last = False)
+
     def get_downloader_callback(self):
         class callback(DownloaderCallback):
             @staticmethod
@@ -0,0 +1,120 @@
+from typing import Callable, Dict, List
+
+from utils.common.model.task_info import DownloadTaskInfo, TaskIndexEntry
+
+from gui.window.download.item_utils import Utils
+
+class TaskListModel:
+    # 下载列表的数据模型，计数、哈希查询和调度都基于此，不依赖界面控件
+    # 每一行为索引项或任务对象，索引项在需要显示或调度时才批量加载为任务对象
+    hydrate_batch_size = 50
+
+    def __init__(self, create_item: Callable[[DownloadTaskInfo], Utils]):
+        self.create_item = create_item
+
+        self.rows: List[TaskIndexEntry | Utils] = []
+        # 任务 id 到行号的映射，按 id 查找时不必遍历整个列表
+        self.index_dict: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def extend(self, entry_list: List[TaskIndexEntry | DownloadTaskInfo | Utils]):
+        start = len(self.rows)
+
+        self.rows.extend(entry if isinstance(entry, (TaskIndexEntry, Utils)) else self.create_item(entry) for entry in entry_list)
+
+        self.update_index(start)
+
+    def remove(self, item: Utils):
+        index = self.index_dict.get(item.task_info.id)
+
+        if index is not None and self.rows[index] is item:
+            del self.rows[index]
+            del self.index_dict[item.task_info.id]
+
+            self.update_index(index)
+
+    def clear(self):
+        self.rows.clear()
+        self.index_dict.clear()
+
+    def get_item(self, index: int):
+        return self.load_item(self.rows[index])
+
+    def load_item(self, row: TaskIndexEntry | Utils) -> Utils | None:
+        if isinstance(row, TaskIndexEntry):
+            # 遍历时同一批次中的索引项可能已被加载，按 id 查找当前的行
+            if (index := self.index_dict.get(row.id)) is None:
+                return None
+
+            current = self.rows[index]
+
+            if isinstance(current, TaskIndexEntry):
+                # 连同后面的索引项一起加载，滚动时不必逐条查询
+                return self.hydrate(self.rows[index:index + self.hydrate_batch_size]).get(row.id)
+
+            return current
+
+        return row
+
+    def hydrate(self, row_list: List[TaskIndexEntry | Utils]):
+        entry_list = [row for row in row_list if isinstance(row, TaskIndexEntry)]
+
+        item_dict: Dict[int, Utils] = {task_info.id: self.create_item(task_info) for task_info in DownloadTaskInfo.load_task_info_list(entry_list)}
+
+        # 原位替换已加载的行，数据库中已不存在的任务直接移除
+        removed_index_list = []
+
+        for entry in entry_list:
+            if (index := self.index_dict.get(entry.id)) is not None and self.rows[index] is entry:
+                if item := item_dict.get(entry.id):
+                    self.rows[index] = item
+                else:
+                    removed_index_list.append(index)
+
+                    del self.index_dict[entry.id]
+
+        if removed_index_list:
+            start = min(removed_index_list)
+            removed_index_set = set(removed_index_list)
+
+            self.rows[start:] = [row for index, row in enumerate(self.rows[start:], start) if index not in removed_index_set]
+
+            self.update_index(start)
+
+        return item_dict
+
+    def update_index(self, start: int = 0):
+        # 重新记录 start 之后各行的行号
+        for index in range(start, len(self.rows)):
+            self.index_dict[self.get_task(self.rows[index]).id] = index
+
+    def iter_items(self, status_list: List[int]):
+        # 按顺序返回指定状态的任务对象，调用方提前结束时不会加载剩余的索引项
+        for row in self.rows.copy():
+            if self.get_task(row).status in status_list:
+                if item := self.load_item(row):
+                    yield item
+
+    def count(self, status_list: List[int]):
+        return sum(1 for row in self.rows if self.get_task(row).status in status_list)
+
+    def set_index_status(self, status: int):
+        # 尚未加载的任务只修改索引中的状态
+        for row in self.rows:
+            if isinstance(row, TaskIndexEntry):
+                row.status = status
+
+    @property
+    def items(self):
+        # 已加载的任务对象
+        return [row for row in self.rows if isinstance(row, Utils)]
+
+    @property
+    def id_list(self):
+        return [self.get_task(row).id for row in self.rows]
+
+    @staticmethod
+    def get_task(row: TaskIndexEntry | Utils) -> TaskIndexEntry | DownloadTaskInfo:
+        return row if isinstance(row, TaskIndexEntry) else row.task_info
@@ -1,16 +1,21 @@
 import wx
 import gettext
-from typing import List, Tuple, Callable
+from functools import partial
+from typing import List, Callable
 
 from utils.config import Config
 
 from utils.common.enums import DownloadStatus
-from utils.common.model.task_info import DownloadTaskInfo
-from utils.common.thread import Thread
+from utils.common.io.task_writer import TaskWriter
+from utils.common.model.task_info import DownloadTaskInfo, TaskIndexEntry
+
+from utils.module.scheduler import DownloadScheduler
 
 from gui.window.download.item_panel_v4 import DownloadTaskItemPanel
+from gui.window.download.item_utils import Utils
+from gui.window.download.model import TaskListModel
 
-from gui.component.panel.scrolled_panel_list import ScrolledPanelList
+from gui.component.panel.virtual_panel_list import VirtualPanelList
 from gui.component.panel.panel import Panel
 
 _ = gettext.gettext
@@ -19,89 +24,64 @@ class BasePage(Panel):
     def __init__(self, parent: wx.Window, name: str):
         Panel.__init__(self, parent, name = name)
 
-        self.scroller: ScrolledPanelList = None
-        self.temp_panel_list: List[Tuple[DownloadTaskItemPanel, int, int]] = []
-
-    def ShowItems(self, callback: Callable = None, load_items: int = None, max_limit: bool = False):
-        self.scroller.ShowListItems(callback, load_items, max_limit)
+        self.scroller: VirtualPanelList = None
+        self.model = TaskListModel(self.create_item)
 
-        self.show_task_info()
+    def ShowItems(self, entry_list: List[TaskIndexEntry | DownloadTaskInfo | Utils], callback: Callable = None):
+        self.model.extend(entry_list)
 
-    def get_panel_items_count(self, condition: List[int]):
-        count = 0
+        self.scroller.RefreshItems()
 
-        for panel in self.panel_items:
-            if isinstance(panel, DownloadTaskItemPanel):
-                if panel.task_info.status in condition:
-                    count += 1
+        if callback:
+            callback()
 
-        return count
-    
-    def show_task_info(self):
-        def worker():
-            for (panel, proportion, flag) in self.temp_panel_list:
-                wx.CallAfter(panel.utils.show_task_info)
+    def RemoveItem(self, item: Utils):
+        self.model.remove(item)
 
-                panel.utils.show_cover()
+        self.scroller.RefreshItems()
 
-            self.temp_panel_list.clear()
-
-        Thread(target = worker).start()
+    def get_items_count(self, condition: List[int]):
+        return self.model.count(condition)
 
     def remove_all_items(self):
         wx.BeginBusyCursor()
 
-        self.scroller.Freeze()
+        id_list = self.model.id_list
 
-        for info in self.scroller.info_list:
-            info.remove_file()
+        DownloadScheduler.clear_waiting()
 
-        self.scroller.info_list.clear()
+        # 只有已加载的任务可能正在下载或留有临时文件
+        for item in self.model.items:
+            item.release()
 
-        for panel in self.panel_items:
-            if isinstance(panel, DownloadTaskItemPanel):
-                panel.utils.destroy_panel(remove_file = True)
+        TaskWriter.remove(id_list)
 
-        self.scroller.remove_more_panel()
-        self.scroller.Remove()
+        self.model.clear()
 
-        self.scroller.Thaw()
+        self.scroller.RefreshItems()
 
         wx.EndBusyCursor()
 
         self.download_window.update_title(self.GetName())
 
-    def is_need_load_more(self):
-        return self.scroller.more
+    def create_item(self, task_info: DownloadTaskInfo):
+        return Utils(self.download_window, task_info)
 
-    @property
-    def panel_items(self):
-        children: List[DownloadTaskItemPanel] = self.scroller.GetChildren()
-        return children
-    
-    @property
-    def hash_id_list(self):
-        temp_list = []
-
-        for panel in self.panel_items:
-            if isinstance(panel, DownloadTaskItemPanel):
-                temp_list.append(panel.task_info.hash_id)
+    def create_panel(self, parent: wx.Window):
+        return DownloadTaskItemPanel(parent, self.download_window)
 
-        for info in self.scroller.info_list:
-            temp_list.append(info.hash_id)
-
-        return temp_list
+    def get_scroller_info(self, empty_label: str):
+        return {
+            "empty_label": empty_label,
+            "get_count": self.model.__len__,
+            "get_item": self.model.get_item,
+            "create_panel": self.create_panel
+        }
 
     @property
-    def total_panel_items(self):
-        count = 0
-
-        for panel in self.panel_items:
-            if isinstance(panel, DownloadTaskItemPanel):
-                count += 1
+    def total_item_count(self):
+        return len(self.model)
 
-        return count 
-    
 class DownloadingPage(BasePage):
     def __init__(self, parent: wx.Window, download_window: wx.Window, name: str):
         self.download_window = download_window
@@ -133,14 +113,7 @@ class DownloadingPage(BasePage):
 
         top_separate_line = wx.StaticLine(self, -1)
 
-        info = {
-            "max_items": 50,
-            "empty_label": _("没有正在下载的项目"),
-            "add_panel_item": self.add_panel_item,
-            "load_more_item": self.ShowItems
-        }
-
-        self.scroller = ScrolledPanelList(self, info)
+        self.scroller = VirtualPanelList(self, self.get_scroller_info(_("没有正在下载的项目")))
         self.scroller.set_dark_mode()
         
         vbox = wx.BoxSizer(wx.VERTICAL)
@@ -161,12 +134,13 @@ class DownloadingPage(BasePage):
         self.start_download(start_all = True)
 
     def onPauseAllEVT(self, event):
-        self.set_info_list_status(DownloadStatus.Pause.value)
+        DownloadScheduler.clear_waiting()
+
+        self.model.set_index_status(DownloadStatus.Pause.value)
 
-        for panel in self.panel_items:
-            if isinstance(panel, DownloadTaskItemPanel):
-                if panel.task_info.status in DownloadStatus.Alive.value:
-                    panel.utils.pause_download()
+        for item in self.model.items:
+            if item.task_info.status in DownloadStatus.Alive.value:
+                item.pause_download()
 
     def onStopAllEVT(self, event):
         self.remove_all_items()
@@ -176,40 +150,47 @@ class DownloadingPage(BasePage):
 
         count = 0
 
-        for panel in self.panel_items:
-            if isinstance(panel, DownloadTaskItemPanel):
-                if self.get_panel_items_count([DownloadStatus.Downloading.value]) < Config.Download.max_download_count:
-                    if panel.task_info.status in [DownloadStatus.Waiting.value, DownloadStatus.Pause.value]:
-                        panel.utils.resume_download()
-                else:
-                    if panel.task_info.status == DownloadStatus.Downloading.value:
-                        count += 1
+        # 正在下载的任务一定已加载，超出并行数的改为等待
+        for item in self.model.items:
+            if item.task_info.status == DownloadStatus.Downloading.value:
+                count += 1
+
+                if count > Config.Download.max_download_count:
+                    item.pause_download(set_waiting_status = True)
 
-                        if count > Config.Download.max_download_count:
-                            panel.utils.pause_download(set_waiting_status = True)
+        self.submit_items([DownloadStatus.Waiting.value, DownloadStatus.Pause.value])
 
         Config.save_app_config()
 
-    def add_panel_item(self, temp_info_list: List[DownloadTaskInfo]):
-        self.temp_panel_list = [(DownloadTaskItemPanel(self.scroller, entry, self.download_window), 0, wx.EXPAND) for entry in temp_info_list]
+    def start_download(self, start_all: bool = False):
+        self.model.set_index_status(DownloadStatus.Waiting.value)
 
-        return self.temp_panel_list
+        if start_all:
+            for item in self.model.items:
+                if item.task_info.status == DownloadStatus.Pause.value:
+                    item.set_download_status(DownloadStatus.Waiting)
 
-    def start_download(self, start_all: bool = False):
-        self.set_info_list_status(DownloadStatus.Waiting.value)
+        self.submit_items(self.get_start_all_condition(start_all))
+
+    def submit_items(self, condition: List[int]):
+        # 启动顺序和并行数由调度器决定，轮到时才加载对应的任务
+        for row in self.model.rows:
+            task = self.model.get_task(row)
+
+            if task.status in condition:
+                DownloadScheduler.submit(task.id, task.priority, task.timestamp, partial(wx.CallAfter, self.start_item, row))
 
-        for panel in self.panel_items:
-            if isinstance(panel, DownloadTaskItemPanel):
-                if panel.task_info.status == DownloadStatus.Pause.value and start_all:
-                    panel.utils.set_download_status(DownloadStatus.Waiting)
+        DownloadScheduler.schedule()
 
-                if panel.task_info.status in self.get_start_all_condition(start_all):
-                    if self.get_panel_items_count([DownloadStatus.Downloading.value]) < Config.Download.max_download_count:
-                        panel.utils.resume_download()
-    
-    def set_info_list_status(self, status: int):
-        for info in self.scroller.info_list:
-            info.status = status
+    def start_item(self, row: TaskIndexEntry | Utils):
+        item = self.model.load_item(row)
+
+        if not item or item.task_info.status == DownloadStatus.Complete.value:
+            # 任务已被删除或已完成，释放位置
+            DownloadScheduler.remove(self.model.get_task(row).id)
+
+        elif item.task_info.status != DownloadStatus.Downloading.value:
+            item.resume_download()
 
     def get_start_all_condition(self, start_all: bool):
         if start_all:
@@ -217,10 +198,6 @@ class DownloadingPage(BasePage):
         else:
             return [DownloadStatus.Waiting.value]
 
-    @property
-    def total_item_count(self):
-        return self.total_panel_items + len(self.scroller.info_list)
-
 class CompletedPage(BasePage):
     def __init__(self, parent: wx.Window, download_window: wx.Window, name: str):
         self.download_window = download_window
@@ -242,14 +219,7 @@ class CompletedPage(BasePage):
 
         top_separate_line = wx.StaticLine(self, -1)
 
-        info = {
-            "max_items": 50,
-            "empty_label": _("没有下载完成的项目"),
-            "add_panel_item": self.add_panel_item,
-            "load_more_item": self.ShowItems
-        }
-
-        self.scroller = ScrolledPanelList(self, info)
+        self.scroller = VirtualPanelList(self, self.get_scroller_info(_("没有下载完成的项目")))
         self.scroller.set_dark_mode()
         
         vbox = wx.BoxSizer(wx.VERTICAL)
@@ -263,13 +233,4 @@ class CompletedPage(BasePage):
         self.clear_history_btn.Bind(wx.EVT_BUTTON, self.onClearAllEVT)
 
     def onClearAllEVT(self, event):
-        self.remove_all_items()
-
-    def add_panel_item(self, temp_info_list: List[DownloadTaskInfo]):
-        self.temp_panel_list = [(DownloadTaskItemPanel(self.scroller, entry, self.download_window), 0, wx.EXPAND) for entry in temp_info_list]
-
-        return self.temp_panel_list
-
-    @property
-    def total_item_count(self):
-        return self.total_panel_items + len(self.scroller.info_list)
\ No newline at end of file
+        self.remove_all_items()
\ No newline at end of file
@@ -8,6 +8,9 @@ from utils.common.thread import Thread
 from utils.common.exception import GlobalException
 from utils.common.style.font import SysFont
 from utils.common.history import History
+from utils.common.io.task_writer import TaskWriter
+
+from utils.module.web.cdn_score import CDNScoreboard
 
 from gui.component.window.frame import Frame
 from gui.component.panel.panel import Panel
@@ -247,6 +250,10 @@ class MainWindow(Frame):
                 self.clipboard_timer.Stop()
                 self.taskbar_icon.Destroy()
 
+                TaskWriter.stop()
+
+                CDNScoreboard.save(force = True)
+
                 event.Skip()
 
     def onShowDownloadWindowEVT(self, event: wx.CommandEvent = None):
@@ -104,9 +104,13 @@ class DownloadPage(Page):
         path_vbox.Add(self.custom_file_name_btn, 0, wx.ALL & (~wx.TOP), self.FromDIP(6))
 
         self.max_download_slider = SliderBox(download_box, _("并行下载数"), 1, 10)
+        self.thread_count_slider = SliderBox(download_box, _("单个任务下载线程数"), 1, 16)
 
         slider_vbox = wx.BoxSizer(wx.VERTICAL)
         slider_vbox.Add(self.max_download_slider, 0, wx.ALL | wx.EXPAND, self.FromDIP(6))
+        slider_vbox.Add(self.thread_count_slider, 0, wx.ALL & (~wx.TOP) | wx.EXPAND, self.FromDIP(6))
+
+        self.parallel_stream_chk = wx.CheckBox(download_box, -1, _("同时下载视频流和音频流"))
 
         self.video_quality_priority_box = PriorityBox(download_box, self.parent, _("画质优先级"), _("画质"), video_quality_priority, video_quality_priority_short, "video_quality_priority")
         self.audio_quality_priority_box = PriorityBox(download_box, self.parent, _("音质优先级"), _("音质"), audio_quality_priority, audio_quality_priority_short, "audio_quality_priority")
@@ -160,6 +164,7 @@ class DownloadPage(Page):
         download_sbox = wx.StaticBoxSizer(download_box, wx.VERTICAL)
         download_sbox.Add(path_vbox, 0, wx.EXPAND)
         download_sbox.Add(slider_vbox, 0, wx.EXPAND)
+        download_sbox.Add(self.parallel_stream_chk, 0, wx.ALL & (~wx.TOP), self.FromDIP(6))
         download_sbox.Add(priority_vbox, 0, wx.EXPAND)
         download_sbox.Add(self.speed_limit_chk, 0, wx.ALL & (~wx.BOTTOM), self.FromDIP(6))
         download_sbox.Add(speed_limit_hbox, 0, wx.EXPAND)
@@ -194,11 +199,13 @@ class DownloadPage(Page):
         Config.Temp.strict_naming = Config.Download.strict_naming
         
         self.max_download_slider.SetValue(Config.Download.max_download_count)
+        self.thread_count_slider.SetValue(Config.Download.thread_count)
 
         self.video_quality_priority_box.init_data()
         self.audio_quality_priority_box.init_data()
         self.video_codec_priority_box.init_data()
                 
+        self.parallel_stream_chk.SetValue(Config.Download.enable_parallel_stream)
         self.speed_limit_chk.SetValue(Config.Download.enable_speed_limit)
         self.add_independent_number_chk.SetValue(Config.Download.add_independent_number)
         self.number_type_choice.SetSelection(Config.Download.number_type)
@@ -216,6 +223,8 @@ class DownloadPage(Page):
 
         Config.Download.path = self.path_box.GetValue()
         Config.Download.max_download_count = self.max_download_slider.GetValue()
+        Config.Download.thread_count = self.thread_count_slider.GetValue()
+        Config.Download.enable_parallel_stream = self.parallel_stream_chk.GetValue()
         Config.Download.add_independent_number = self.add_independent_number_chk.GetValue()
         Config.Download.number_type = self.number_type_choice.GetSelection()
         Config.Download.delete_history = self.delete_history_chk.GetValue()
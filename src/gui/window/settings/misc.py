@@ -11,8 +11,12 @@ from utils.config import Config
 from utils.common.enums import EpisodeDisplayType, Platform
 from utils.common.io.file import File
 from utils.common.io.directory import Directory
+from utils.common.io.task_store import TaskStore
+from utils.common.io.task_writer import TaskWriter
 import utils.common.compile_data as json_data
 
+from utils.module.web.cdn_score import CDNScoreboard
+
 from gui.window.settings.page import Page
 
 _ = gettext.gettext
@@ -123,6 +127,9 @@ class MiscPage(Page):
 
             File.remove_files(files)
 
+            TaskWriter.stop()
+            TaskStore.close()
+
             shutil.rmtree(Config.User.directory)
 
             self.restart()
@@ -139,6 +146,10 @@ class MiscPage(Page):
         Directory.open_directory(Config.User.directory)
 
     def restart(self):
+        TaskWriter.stop()
+
+        CDNScoreboard.save(force = True)
+
         extra_data: dict = json.loads(inspect.getsource(json_data))
 
         match extra_data.get("channel"):
@@ -14,7 +14,7 @@ from Crypto.Cipher import PKCS1_OAEP
 from utils.config import Config
 from utils.auth.login_v2 import Login
 
-from utils.common.request import RequestUtils
+from utils.common.request import RequestUtils, HeaderCache
 from utils.common.datetime_util import DateTime
 from utils.common.data.rsa_key import correspond_path_key
 from utils.common.data.exclimbwuzhi import ex_data
@@ -49,6 +49,8 @@ class Utils:
         Config.Auth.bili_ticket = data["data"]["ticket"]
         Config.Auth.bili_ticket_expires = DateTime.get_timedelta(DateTime.now(), 3)
 
+        HeaderCache.invalidate()
+
     @classmethod
     def get_nav_info(cls):
         url = "https://api.bilibili.com/x/web-interface/nav"
@@ -79,6 +81,8 @@ class Utils:
         Config.Auth.buvid4 = data["data"]["b_4"]
         Config.Auth.b_nut = DateTime.get_timestamp()
 
+        HeaderCache.invalidate()
+
     @staticmethod
     def get_uuid():
         t = DateTime.get_timestamp() % 100000
@@ -89,6 +93,8 @@ class Utils:
 
         Config.Auth.uuid = "-".join([gen_part(l) for l in pck]) + str(t).ljust(5, "0") + "infoc"  # noqa: E741
 
+        HeaderCache.invalidate()
+
     @staticmethod
     def get_b_lsid():
         ret = ""
@@ -100,6 +106,8 @@ class Utils:
 
         Config.Auth.b_lsid = ret
 
+        HeaderCache.invalidate()
+
     @staticmethod
     def get_buvid_fp():
         def rotate_left(x: int, k: int):
@@ -197,6 +205,8 @@ class Utils:
 
         Config.Auth.buvid_fp = "{}{}".format(hex(m & (MOD - 1))[2:], hex(m >> 64)[2:])
 
+        HeaderCache.invalidate()
+
     @classmethod
     def exclimbwuzhi(cls, template: dict, correspond_path = None):
         context = {
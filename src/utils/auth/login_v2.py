@@ -5,7 +5,7 @@ import urllib.parse
 from io import BytesIO
 
 from utils.config import Config
-from utils.common.request import RequestUtils
+from utils.common.request import RequestUtils, HeaderCache
 from utils.common.enums import StatusCode, Platform
 from utils.common.exception import GlobalException
 from utils.common.datetime_util import DateTime
@@ -216,6 +216,8 @@ class Login:
         if "login_expires" in info:
             Config.User.login_expires = info.get("login_expires")
 
+        HeaderCache.invalidate()
+
         Config.save_user_config()
 
         cls.on_login_success()
@@ -261,6 +263,8 @@ class Login:
         Config.User.DedeUserID__ckMd5 = ""
         Config.User.bili_jct = ""
 
+        HeaderCache.invalidate()
+
         Config.save_user_config()
 
         Face.remove()
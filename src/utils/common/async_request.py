@@ -0,0 +1,27 @@
+import asyncio
+from typing import Callable, List, Any
+
+from utils.config import Config
+
+class AsyncRequestUtils:
+    # 基于 asyncio 的并发请求层，阻塞的请求在线程中执行，复用 RequestUtils 的连接池，并通过信号量限制同时进行的请求数
+    # 请求频率由解析器中的 RateLimiter 统一控制
+    @staticmethod
+    async def call(semaphore: asyncio.Semaphore, func: Callable, *args):
+        async with semaphore:
+            return await asyncio.to_thread(func, *args)
+
+    @classmethod
+    async def gather(cls, func: Callable, args_list: List[tuple], max_concurrency: int = None):
+        semaphore = asyncio.Semaphore(max_concurrency or Config.Advanced.api_max_concurrency)
+
+        # 返回结果与 args_list 的顺序一致，任意一个请求出错时抛出异常
+        return await asyncio.gather(*[cls.call(semaphore, func, *args) for args in args_list])
+
+    @classmethod
+    def run(cls, func: Callable, args_list: List[tuple], max_concurrency: int = None) -> List[Any]:
+        # 同步调用入口，供运行在工作线程中的解析器使用
+        if not args_list:
+            return []
+
+        return asyncio.run(cls.gather(func, args_list, max_concurrency))
@@ -185,4 +185,9 @@ class TemplateType(Enum):
     Bangumi_strict = 6            # 剧集（严格命名）
     Cheese = 7                    # 课程
     Space = 8                     # 个人主页
-    Favlist = 9                   # 收藏夹
\ No newline at end of file
+    Favlist = 9                   # 收藏夹
+
+class VerifyStatus(Enum):
+    Skipped = 0                   # 未校验
+    Passed = 1                    # 校验通过
+    Failed = 2                    # 校验失败
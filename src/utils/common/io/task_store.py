@@ -0,0 +1,252 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Set
+
+from utils.config import Config
+from utils.common.io.file import File
+
+try:
+    # 可选依赖，安装后使用更快的 JSON 编解码
+    import orjson
+
+except ImportError:
+    orjson = None
+
+class TaskStore:
+    # 下载任务存储，所有任务保存在同一个 SQLite 数据库中，替代每个任务一个 info_*.json 文件的方式
+    lock = threading.RLock()
+
+    connection: sqlite3.Connection = None
+
+    # 进度更新时单独写入的字段，其余字段保存在 data 列中
+    progress_columns = ("status", "progress", "total_file_size", "total_downloaded_size", "current_downloaded_size", "thread_info")
+
+    query_batch_size = 500
+
+    @classmethod
+    def get_connection(cls):
+        with cls.lock:
+            if not cls.connection:
+                cls.connection = sqlite3.connect(Config.User.task_db_path, check_same_thread = False, isolation_level = None)
+
+                # WAL 模式下读写互不阻塞，单次提交只追加日志，不重写整个数据库
+                cls.connection.execute("PRAGMA journal_mode = WAL")
+                cls.connection.execute("PRAGMA synchronous = NORMAL")
+
+                cls.create_table()
+
+            return cls.connection
+
+    @classmethod
+    def create_table(cls):
+        cls.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                hash_id TEXT NOT NULL DEFAULT '',
+                status INTEGER NOT NULL DEFAULT 0,
+                timestamp INTEGER NOT NULL DEFAULT 0,
+                min_version INTEGER NOT NULL DEFAULT 0,
+                priority INTEGER NOT NULL DEFAULT 0,
+                progress INTEGER NOT NULL DEFAULT 0,
+                total_file_size INTEGER NOT NULL DEFAULT 0,
+                total_downloaded_size INTEGER NOT NULL DEFAULT 0,
+                current_downloaded_size INTEGER NOT NULL DEFAULT 0,
+                thread_info TEXT NOT NULL DEFAULT '{}',
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+            CREATE INDEX IF NOT EXISTS idx_tasks_timestamp ON tasks (timestamp);
+            CREATE INDEX IF NOT EXISTS idx_tasks_hash_id ON tasks (hash_id);
+        """)
+
+        # 旧版本数据库没有 priority 列
+        if "priority" not in [row[1] for row in cls.connection.execute("PRAGMA table_info(tasks)")]:
+            cls.connection.execute("ALTER TABLE tasks ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+
+    @classmethod
+    def save(cls, data: dict):
+        cls.save_many([data])
+
+    @classmethod
+    def save_many(cls, data_list: List[dict]):
+        cls.write_batch(data_list, [])
+
+    @classmethod
+    def update_progress(cls, data: dict):
+        cls.write_batch([], [data])
+
+    @classmethod
+    def write_batch(cls, data_list: List[dict], progress_list: List[dict]):
+        # 批量写入放在同一个事务中，只提交一次，中途出错时整体回滚，不会留下写了一半的任务
+        with cls.lock:
+            connection = cls.get_connection()
+
+            with cls.transaction(connection):
+                connection.executemany("""
+                    INSERT OR REPLACE INTO tasks (id, hash_id, status, timestamp, min_version, priority, progress, total_file_size, total_downloaded_size, current_downloaded_size, thread_info, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [cls.to_row(data) for data in data_list])
+
+                # 仅更新进度相关字段，不重新序列化整个任务
+                connection.executemany(f"""
+                    UPDATE tasks SET {", ".join(f"{column} = ?" for column in cls.progress_columns)} WHERE id = ?
+                """, [[cls.dumps(data[column]) if column == "thread_info" else data[column] for column in cls.progress_columns] + [data["id"]] for data in progress_list])
+
+    @classmethod
+    def remove(cls, id: int):
+        cls.remove_many([id])
+
+    @classmethod
+    def remove_many(cls, id_list: List[int]):
+        with cls.lock:
+            connection = cls.get_connection()
+
+            with cls.transaction(connection):
+                connection.executemany("DELETE FROM tasks WHERE id = ?", [(id, ) for id in id_list])
+
+    @classmethod
+    def load_all(cls) -> List[dict]:
+        with cls.lock:
+            cursor = cls.get_connection().execute(f"SELECT {', '.join(cls.progress_columns)}, data FROM tasks ORDER BY timestamp")
+
+            return [cls.from_row(row) for row in cursor.fetchall()]
+
+    @classmethod
+    def load_index(cls) -> List[tuple]:
+        # 只读取索引列，不解析 data 列，启动时间与任务数量基本无关
+        with cls.lock:
+            cursor = cls.get_connection().execute("SELECT id, hash_id, status, timestamp, min_version, priority FROM tasks ORDER BY timestamp")
+
+            return cursor.fetchall()
+
+    @classmethod
+    def load_many(cls, id_list: List[int]) -> Dict[int, dict]:
+        data_dict: Dict[int, dict] = {}
+
+        with cls.lock:
+            connection = cls.get_connection()
+
+            # SQLite 单条语句的参数数量有限，分批查询
+            for index in range(0, len(id_list), cls.query_batch_size):
+                batch = id_list[index:index + cls.query_batch_size]
+
+                cursor = connection.execute(f"SELECT {', '.join(cls.progress_columns)}, data FROM tasks WHERE id IN ({', '.join('?' * len(batch))})", batch)
+
+                for row in cursor.fetchall():
+                    data = cls.from_row(row)
+
+                    data_dict[data["id"]] = data
+
+        return data_dict
+
+    @classmethod
+    def find_hash_ids(cls, hash_id_list: List[str]) -> Set[str]:
+        # 通过 hash_id 列上的索引查找已存在的任务，新建和删除任务时该列随之更新，无需遍历任务列表
+        hash_id_set: Set[str] = set()
+        hash_id_list = list(set(hash_id_list))
+
+        with cls.lock:
+            connection = cls.get_connection()
+
+            for index in range(0, len(hash_id_list), cls.query_batch_size):
+                batch = hash_id_list[index:index + cls.query_batch_size]
+
+                cursor = connection.execute(f"SELECT DISTINCT hash_id FROM tasks WHERE hash_id IN ({', '.join('?' * len(batch))})", batch)
+
+                hash_id_set.update(row[0] for row in cursor.fetchall())
+
+        return hash_id_set
+
+    @classmethod
+    def migrate(cls):
+        # 将旧版本的 info_*.json 任务文件导入数据库，导入成功后删除原文件
+        data_list: List[dict] = []
+        file_path_list: List[str] = []
+
+        for file_name in os.listdir(Config.User.task_file_directory):
+            if file_name.startswith("info_") and file_name.endswith(".json"):
+                file_path = os.path.join(Config.User.task_file_directory, file_name)
+
+                try:
+                    with open(file_path, "r", encoding = "utf-8") as f:
+                        data: dict = json.loads(f.read())
+
+                    if "id" in data:
+                        data_list.append(data)
+
+                except Exception:
+                    # 文件已损坏，无法恢复
+                    pass
+
+                file_path_list.append(file_path)
+
+        if file_path_list:
+            cls.save_many(data_list)
+
+            File.remove_files(file_path_list)
+
+    @classmethod
+    def close(cls):
+        with cls.lock:
+            if cls.connection:
+                cls.connection.close()
+
+                cls.connection = None
+
+    @staticmethod
+    @contextmanager
+    def transaction(connection: sqlite3.Connection):
+        connection.execute("BEGIN")
+
+        try:
+            yield
+
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        connection.execute("COMMIT")
+
+    @classmethod
+    def to_row(cls, data: dict):
+        return (
+            data["id"],
+            data.get("hash_id", ""),
+            data.get("status", 0),
+            data.get("timestamp", 0),
+            data.get("min_version", 0),
+            data.get("priority", 0),
+            data.get("progress", 0),
+            data.get("total_file_size", 0),
+            data.get("total_downloaded_size", 0),
+            data.get("current_downloaded_size", 0),
+            cls.dumps(data.get("thread_info", {})),
+            cls.dumps({key: value for key, value in data.items() if key != "thread_info"})
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple) -> Dict:
+        data: dict = cls.loads(row[-1])
+
+        # 进度字段以单独的列为准
+        for column, value in zip(cls.progress_columns, row):
+            data[column] = cls.loads(value) if column == "thread_info" else value
+
+        return data
+
+    @staticmethod
+    def dumps(data: dict):
+        if orjson:
+            return orjson.dumps(data).decode("utf-8")
+
+        return json.dumps(data, ensure_ascii = False, separators = (",", ":"))
+
+    @staticmethod
+    def loads(data: str):
+        if orjson:
+            return orjson.loads(data)
+
+        return json.loads(data)
@@ -0,0 +1,124 @@
+import sys
+import threading
+from typing import Dict, List, Set
+
+from utils.config import Config
+from utils.common.io.task_store import TaskStore
+from utils.common.exception import exception_handler
+
+class TaskWriter:
+    # 延迟写入下载任务，同一任务在一个周期内的多次修改只写入最后一次，由后台线程批量提交
+    lock = threading.Lock()
+
+    # 需要完整写入的任务
+    pending_dict: Dict[int, dict] = {}
+    # 仅进度变化的任务
+    pending_progress_dict: Dict[int, dict] = {}
+    # 已删除的任务，之后到达的修改不再写入
+    removed_id_set: Set[int] = set()
+
+    flush_lock = threading.Lock()
+    wakeup_event = threading.Event()
+
+    thread: threading.Thread = None
+
+    @classmethod
+    def add(cls, data: dict):
+        with cls.lock:
+            if data["id"] in cls.removed_id_set:
+                return
+
+            cls.pending_dict[data["id"]] = data
+            cls.pending_progress_dict.pop(data["id"], None)
+
+        cls.start()
+
+    @classmethod
+    def add_progress(cls, data: dict):
+        with cls.lock:
+            if data["id"] in cls.removed_id_set:
+                return
+
+            if entry := cls.pending_dict.get(data["id"]):
+                # 已有待写入的完整数据，合并进度字段即可
+                entry.update(data)
+            else:
+                cls.pending_progress_dict[data["id"]] = data
+
+        cls.start()
+
+    @classmethod
+    def remove(cls, id_list: List[int]):
+        # 删除任务，持有 flush_lock 保证已取出但尚未提交的修改不会在删除后又被写回
+        with cls.flush_lock:
+            with cls.lock:
+                cls.removed_id_set.update(id_list)
+
+                for id in id_list:
+                    cls.pending_dict.pop(id, None)
+                    cls.pending_progress_dict.pop(id, None)
+
+            TaskStore.remove_many(id_list)
+
+    @classmethod
+    def flush(cls):
+        # 暂停、完成和退出时调用，立即写入所有待写入的修改
+        with cls.flush_lock:
+            with cls.lock:
+                pending_dict = cls.pending_dict.copy()
+                pending_progress_dict = cls.pending_progress_dict.copy()
+
+                cls.pending_dict.clear()
+                cls.pending_progress_dict.clear()
+
+            if pending_dict or pending_progress_dict:
+                try:
+                    TaskStore.write_batch(list(pending_dict.values()), list(pending_progress_dict.values()))
+
+                except Exception:
+                    # 写入失败时放回未写入的修改，下一个周期重试
+                    cls.restore(pending_dict, pending_progress_dict)
+
+                    raise
+
+    @classmethod
+    def restore(cls, pending_dict: Dict[int, dict], pending_progress_dict: Dict[int, dict]):
+        with cls.lock:
+            for id, data in pending_dict.items():
+                if id in cls.removed_id_set or id in cls.pending_dict:
+                    continue
+
+                # 之后到达的进度比放回的数据更新
+                if progress := cls.pending_progress_dict.pop(id, None):
+                    data.update(progress)
+
+                cls.pending_dict[id] = data
+
+            for id, data in pending_progress_dict.items():
+                if id in cls.removed_id_set or id in cls.pending_dict or id in cls.pending_progress_dict:
+                    continue
+
+                cls.pending_progress_dict[id] = data
+
+    @classmethod
+    def start(cls):
+        with cls.lock:
+            if not cls.thread:
+                cls.thread = threading.Thread(target = cls.worker, daemon = True)
+                cls.thread.start()
+
+    @classmethod
+    def worker(cls):
+        while not cls.wakeup_event.wait(Config.Download.task_flush_interval):
+            try:
+                cls.flush()
+
+            except Exception:
+                # 记录错误后继续运行，否则之后的修改都不会再写入
+                exception_handler(*sys.exc_info())
+
+    @classmethod
+    def stop(cls):
+        cls.wakeup_event.set()
+
+        cls.flush()
@@ -0,0 +1,146 @@
+import time
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+
+from utils.config import Config
+
+class TokenBucket:
+    # 令牌桶，按 rate 速率补充令牌，最多积累 capacity 个，用于平滑同一接口的请求频率
+    def __init__(self, rate: float, capacity: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+
+        self.tokens = capacity
+
+        # 上次补充令牌的时间，触发风控后会被推迟到冷却结束，冷却期间不补充令牌
+        self.last_time = time.monotonic()
+
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float = 1):
+        # 预定 amount 个令牌，返回需要等待的秒数，等待在锁外进行
+        with self.lock:
+            now = time.monotonic()
+
+            if now > self.last_time:
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_time) * self.rate)
+                self.last_time = now
+
+            self.tokens -= amount
+
+            # 令牌不足时按欠下的数量排队，多个等待者依次错开
+            ready_time = self.last_time + max(0, -self.tokens) / self.rate
+
+            return max(0, ready_time - now)
+
+    def set_rate(self, rate: float, capacity: float):
+        # 修改速率时保留已积累的令牌和欠下的数量
+        with self.lock:
+            self.max_rate = self.rate = rate
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    def on_success(self):
+        # 加性增：请求正常时逐步恢复到允许的最大速率
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def on_risk_control(self, cooldown: float):
+        # 乘性减：触发风控时速率减半，清空已积累的令牌并进入冷却
+        with self.lock:
+            self.rate = max(self.max_rate * 0.05, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+            self.last_time = max(self.last_time, time.monotonic() + cooldown)
+
+class RateLimiter:
+    # 所有解析请求的统一限流入口，每个接口路径对应一个令牌桶，根据风控响应自适应调整速率
+    lock = threading.Lock()
+
+    bucket_dict: Dict[str, TokenBucket] = {}
+
+    # -412：请求被拦截，-352：风控校验失败
+    risk_control_code = (-412, -352)
+
+    # 触发风控后的冷却时间，单位秒
+    cooldown = 3
+
+    @classmethod
+    def acquire(cls, url: str):
+        if delay := cls.get_bucket(url).reserve():
+            time.sleep(delay)
+
+    @classmethod
+    def feedback(cls, url: str, code: int):
+        bucket = cls.get_bucket(url)
+
+        if code in cls.risk_control_code:
+            bucket.on_risk_control(cls.cooldown)
+        else:
+            bucket.on_success()
+
+    @classmethod
+    def get_bucket(cls, url: str):
+        key = cls.get_key(url)
+
+        with cls.lock:
+            if key not in cls.bucket_dict:
+                rate = Config.Advanced.api_rate_limit
+
+                cls.bucket_dict[key] = TokenBucket(rate, capacity = max(1, rate))
+
+            return cls.bucket_dict[key]
+
+    @staticmethod
+    def get_key(url: str):
+        parsed_url = urlparse(url)
+
+        return parsed_url.netloc + parsed_url.path
+
+class SpeedLimiter:
+    # 全局下载限速，令牌单位为字节，总限额按正在下载的任务平均分配，每个任务一个令牌桶
+    # 按任务而不是按连接分配，分片线程多的任务不会占用更多的带宽
+    lock = threading.Lock()
+
+    bucket_dict: Dict[object, TokenBucket] = {}
+    # 每个任务最后一次下载数据的时间
+    active_dict: Dict[object, float] = {}
+
+    # 允许的突发量，单位秒，即空闲后最多可一次性下载多少秒的限额
+    burst_time = 1
+    # 超过此时间没有下载数据的任务不再参与分配，单位秒
+    active_time = 5
+
+    @classmethod
+    def consume(cls, size: int, key: object = None):
+        # 数据写入后调用，key 为所属任务，调用方不能持有任何锁
+        if not Config.Download.enable_speed_limit:
+            return
+
+        if delay := cls.get_bucket(key).reserve(size):
+            time.sleep(delay)
+
+    @classmethod
+    def get_bucket(cls, key: object = None):
+        rate = Config.Download.speed_mbps * 1024 * 1024
+        now = time.monotonic()
+
+        with cls.lock:
+            cls.active_dict[key] = now
+
+            for inactive_key in [entry for entry, last_time in cls.active_dict.items() if now - last_time > cls.active_time]:
+                del cls.active_dict[inactive_key]
+
+                cls.bucket_dict.pop(inactive_key, None)
+
+            share = rate / len(cls.active_dict)
+
+            # 限速值修改或任务数量变化时调整每个任务的速率
+            if not (bucket := cls.bucket_dict.get(key)):
+                bucket = cls.bucket_dict[key] = TokenBucket(share, capacity = share * cls.burst_time)
+
+            elif bucket.max_rate != share:
+                bucket.set_rate(share, share * cls.burst_time)
+
+            return bucket
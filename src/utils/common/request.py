@@ -1,31 +1,165 @@
 import requests
+import threading
 import requests.auth
-from typing import Optional, List
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
+from typing import Optional, List, Dict, Tuple
 
 from utils.common.enums import ProxyMode
 
 from utils.config import Config
 
+class ConnectionPool:
+    # API 请求和音视频流下载使用不同的连接池，避免下载线程占满 API 请求的连接
+    media_host_suffix = (".bilivideo.com", ".bilivideo.cn", ".akamaized.net", ".szbdyd.com")
+
+    @classmethod
+    def create_session(cls, pool_size: int, retry_count: int = None):
+        session = requests.Session()
+
+        if retry_count is None:
+            retry_count = Config.Advanced.request_retry_count
+
+        retry = Retry(total = retry_count, connect = retry_count, read = 0, status = 0, backoff_factor = 0.3)
+
+        adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size, max_retries = retry)
+
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
+
+    @classmethod
+    def is_media_host(cls, url: str):
+        host = urlparse(url).netloc
+
+        return host.endswith(cls.media_host_suffix) or host in Config.Advanced.cdn_list
+
+    @staticmethod
+    def get_session_stats(session: requests.Session):
+        stats_list = []
+
+        adapter: HTTPAdapter = session.get_adapter("https://")
+
+        # 使用代理时连接池位于对应的 proxy_manager 中
+        manager_list = [adapter.poolmanager, *list(adapter.proxy_manager.values())]
+
+        for manager in manager_list:
+            for key in manager.pools.keys():
+                if not (pool := manager.pools.get(key)) or not pool.pool:
+                    continue
+
+                # 队列中为 None 的位置表示尚未创建连接，其余为空闲的长连接
+                queue = list(pool.pool.queue)
+
+                stats_list.append({
+                    "host": pool.host,
+                    "max_size": pool.pool.maxsize,
+                    "in_use": pool.pool.maxsize - len(queue),
+                    "idle": sum(1 for conn in queue if conn),
+                    "created": pool.num_connections,
+                    "requests": pool.num_requests
+                })
+
+        return stats_list
+
+class HeaderCache:
+    # 缓存拼接好的 Cookie 字符串，仅在登录或认证信息变化时重新生成
+    lock = threading.Lock()
+
+    # 修改认证信息后递增，缓存的版本号与之不同时重新生成
+    version: int = 0
+
+    cookie_cache: Dict[bool, Tuple[int, str]] = {}
+
+    @classmethod
+    def get_cookie(cls, sessdata: bool):
+        version = cls.version
+
+        if (entry := cls.cookie_cache.get(sessdata)) and entry[0] == version:
+            return entry[1]
+
+        cookie = cls.build_cookie(sessdata)
+
+        with cls.lock:
+            cls.cookie_cache[sessdata] = (version, cookie)
+
+        return cookie
+
+    @classmethod
+    def invalidate(cls):
+        # 写入登录或认证信息后调用
+        with cls.lock:
+            cls.version += 1
+
+    @staticmethod
+    def build_cookie(sessdata: bool):
+        cookies = {
+            "CURRENT_FNVAL": "4048",
+            "b_lsid": Config.Auth.b_lsid,
+            "_uuid": Config.Auth.uuid,
+            "buvid_fp": Config.Auth.buvid_fp
+        }
+
+        if sessdata:
+            cookies["SESSDATA"] = Config.User.SESSDATA
+            cookies["DedeUserID"] = Config.User.DedeUserID
+            cookies["DedeUserID__ckMd5"] = Config.User.DedeUserID__ckMd5
+            cookies["bili_jct"] = Config.User.bili_jct
+
+        if Config.Auth.buvid3:
+            cookies["buvid3"] = Config.Auth.buvid3
+            cookies["b_nut"] = Config.Auth.b_nut
+        
+        if Config.Auth.bili_ticket:
+            cookies["bili_ticket"] = Config.Auth.bili_ticket
+
+        if Config.Auth.buvid4:
+            cookies["buvid4"] = Config.Auth.buvid4
+
+        return ";".join([f"{key}={value}" for key, value in cookies.items()])
+
 class RequestUtils:
-    session = requests.Session()
+    session = ConnectionPool.create_session(Config.Advanced.api_pool_size)
+    media_session = ConnectionPool.create_session(Config.Advanced.media_pool_size)
+    # 探测 CDN 节点时不重试，无法连接的节点直接判定失败
+    probe_session = ConnectionPool.create_session(Config.Advanced.media_pool_size, retry_count = 0)
 
     @classmethod
     def request_get(cls, url: str, headers = None, proxies = None, auth = None, stream = False, allow_redirects = True):
         headers, proxies, auth = cls.get_params(headers, proxies, auth)
         
-        return cls.session.get(cls.get_protocol(url), headers = headers, proxies = proxies, auth = auth, stream = stream, verify = Config.Advanced.enable_ssl_verify, timeout = 5, allow_redirects = allow_redirects)
+        return cls.get_session(url).get(cls.get_protocol(url), headers = headers, proxies = proxies, auth = auth, stream = stream, verify = Config.Advanced.enable_ssl_verify, timeout = 5, allow_redirects = allow_redirects)
     
     @classmethod
     def request_post(cls, url: str, headers = None, proxies = None, auth = None, params = None, json = None):
         headers, proxies, auth = cls.get_params(headers, proxies, auth)
 
-        return cls.session.post(cls.get_protocol(url), headers = headers, params = params, json = json, proxies = proxies, auth = auth, verify = Config.Advanced.enable_ssl_verify, timeout = 5)
+        return cls.get_session(url).post(cls.get_protocol(url), headers = headers, params = params, json = json, proxies = proxies, auth = auth, verify = Config.Advanced.enable_ssl_verify, timeout = 5)
 
     @classmethod
-    def request_head(cls, url: str, headers = None, proxies = None, auth = None):
+    def request_head(cls, url: str, headers = None, proxies = None, auth = None, retry: bool = True):
         headers, proxies, auth = cls.get_params(headers, proxies, auth)
 
-        return cls.session.head(cls.get_protocol(url), headers = headers, proxies = proxies, auth = auth, verify = Config.Advanced.enable_ssl_verify, timeout = 5)
+        session = cls.get_session(url) if retry else cls.probe_session
+
+        return session.head(cls.get_protocol(url), headers = headers, proxies = proxies, auth = auth, verify = Config.Advanced.enable_ssl_verify, timeout = 5)
+
+    @classmethod
+    def get_session(cls, url: str):
+        if ConnectionPool.is_media_host(url):
+            return cls.media_session
+        else:
+            return cls.session
+
+    @classmethod
+    def get_pool_stats(cls) -> Dict[str, List[dict]]:
+        return {
+            "api": ConnectionPool.get_session_stats(cls.session),
+            "media": ConnectionPool.get_session_stats(cls.media_session),
+            "probe": ConnectionPool.get_session_stats(cls.probe_session)
+        }
 
     @classmethod
     def get_params(cls, headers = None, proxies = None, auth = None):
@@ -42,43 +176,21 @@ class RequestUtils:
 
     @staticmethod
     def get_headers(referer_url: Optional[str] = None, sessdata: Optional[str] = None, range: Optional[List[int]] = None):
-        def cookie():
-            if Config.Auth.buvid3:
-                cookies["buvid3"] = Config.Auth.buvid3
-                cookies["b_nut"] = Config.Auth.b_nut
-            
-            if Config.Auth.bili_ticket:
-                cookies["bili_ticket"] = Config.Auth.bili_ticket
-
-            if Config.Auth.buvid4:
-                cookies["buvid4"] = Config.Auth.buvid4
-
         headers = {
             "User-Agent": Config.Advanced.user_agent,
-        }
-
-        cookies = {
-            "CURRENT_FNVAL": "4048",
-            "b_lsid": Config.Auth.b_lsid,
-            "_uuid": Config.Auth.uuid,
-            "buvid_fp": Config.Auth.buvid_fp
+            "Cookie": HeaderCache.get_cookie(bool(sessdata))
         }
 
         if referer_url:
             headers["Referer"] = referer_url
 
-        if sessdata:
-            cookies["SESSDATA"] = Config.User.SESSDATA
-            cookies["DedeUserID"] = Config.User.DedeUserID
-            cookies["DedeUserID__ckMd5"] = Config.User.DedeUserID__ckMd5
-            cookies["bili_jct"] = Config.User.bili_jct
-
         if range:
             headers["Range"] = f"bytes={range[0]}-{range[1]}"
+            # 分片直接读取原始数据写入文件，不能接受压缩后的内容
+            headers["Accept-Encoding"] = "identity"
 
-        cookie()
-
-        headers["Cookie"] = ";".join([f"{key}={value}" for key, value in cookies.items()])
+        if not Config.Advanced.enable_keep_alive:
+            headers["Connection"] = "close"
 
         return headers
 
@@ -64,6 +64,12 @@ app_config_group = {
         "file_name_template_list",
         "strict_naming",
         "max_download_count",
+        "thread_count",
+        "max_connection_per_host",
+        "enable_parallel_stream",
+        "enable_resume_checksum",
+        "enable_md5_verify",
+        "task_flush_interval",
         "video_quality_priority",
         "audio_quality_priority",
         "video_codec_priority",
@@ -90,6 +96,12 @@ app_config_group = {
         "download_suspend_retry_interval",
         "always_use_https_protocol",
         "enable_ssl_verify",
+        "api_pool_size",
+        "media_pool_size",
+        "enable_keep_alive",
+        "request_retry_count",
+        "api_max_concurrency",
+        "api_rate_limit",
         "user_agent",
         "webpage_option",
         "websocket_port"
@@ -168,6 +180,7 @@ class Config:
         app_config_path: str = ""
         lang_config_path: str = ""
         history_file_path: str = ""
+        cdn_score_file_path: str = ""
         err_log_path: str = ""
 
     class Basic:
@@ -285,6 +298,7 @@ class Config:
     class User:
         directory: str = ""
         task_file_directory: str = ""
+        task_db_path: str = ""
         live_file_directory: str = ""
         user_config_path: str = ""
 
@@ -403,6 +417,16 @@ class Config:
         video_codec_id: int = 20
 
         max_download_count: int = 1
+        thread_count: int = 4
+        # 同一 CDN 主机的最大连接数，所有任务共用
+        max_connection_per_host: int = 16
+        enable_parallel_stream: bool = True
+        # 断点续传时校验已下载的数据块
+        enable_resume_checksum: bool = False
+        # 下载完成后使用 ETag 中的 MD5 校验文件，部分 CDN 的 ETag 并非 MD5，默认关闭
+        enable_md5_verify: bool = False
+        # 下载任务延迟写入间隔，单位秒
+        task_flush_interval: float = 2.0
 
         enable_notification: bool = False
         delete_history: bool = False
@@ -493,6 +517,14 @@ class Config:
         always_use_https_protocol: bool = True
         enable_ssl_verify: bool = True
 
+        # 连接池设置
+        api_pool_size: int = 10
+        media_pool_size: int = 32
+        enable_keep_alive: bool = True
+        request_retry_count: int = 2
+        api_max_concurrency: int = 4
+        api_rate_limit: float = 5.0
+
         user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36 Edg/141.0.0.0"
 
         webpage_option: int = 0
@@ -633,10 +665,12 @@ class Config:
         Config.APP.app_config_path = os.path.join(Config.User.directory, "config.json")
         Config.APP.lang_config_path = os.path.join(Config.User.directory, "lang.ini")
         Config.APP.history_file_path = os.path.join(Config.User.directory, "history.json")
+        Config.APP.cdn_score_file_path = os.path.join(Config.User.directory, "cdn_score.json")
         Config.APP.err_log_path = os.path.join(Config.User.directory, "error_log.txt")
 
         Config.User.user_config_path = os.path.join(Config.User.directory, "user.json")
         Config.User.task_file_directory = os.path.join(Config.User.directory, "Tasks")
+        Config.User.task_db_path = os.path.join(Config.User.task_file_directory, "tasks.db")
         Config.User.live_file_directory = os.path.join(Config.User.directory, "Live")
 
     @classmethod
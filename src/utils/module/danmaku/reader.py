@@ -0,0 +1,111 @@
+import heapq
+import itertools
+from io import BytesIO
+from typing import List
+
+import utils.module.danmaku.dm_pb2 as dm_pb2
+
+class DanmakuRecord:
+    # 直接从 protobuf 消息中读取的弹幕，只保留字段值，内存占用远小于 MessageToDict 生成的字典
+    __slots__ = ("id", "progress", "mode", "fontsize", "color", "mid_hash", "content", "ctime", "weight", "action", "pool", "id_str", "attr", "animation", "colorful", "cid", "dm_from")
+
+    # 导出 JSON 时的字段顺序和名称，与 MessageToDict 的输出一致，int64 字段转为字符串，枚举字段转为名称
+    json_fields = (
+        ("id", "id", str),
+        ("progress", "progress", None),
+        ("mode", "mode", None),
+        ("fontsize", "fontsize", None),
+        ("color", "color", None),
+        ("midHash", "mid_hash", None),
+        ("content", "content", None),
+        ("ctime", "ctime", str),
+        ("weight", "weight", None),
+        ("action", "action", None),
+        ("pool", "pool", None),
+        ("idStr", "id_str", None),
+        ("attr", "attr", None),
+        ("animation", "animation", None),
+        ("colorful", "colorful", dm_pb2.DmColorfulType.Name),
+        ("cid", "cid", str),
+        ("dmFrom", "dm_from", dm_pb2.DmFromType.Name)
+    )
+
+    def __init__(self, elem: dm_pb2.DanmakuElem):
+        self.id = elem.id
+        self.progress = elem.progress
+        self.mode = elem.mode
+        self.fontsize = elem.fontsize
+        self.color = elem.color
+        self.mid_hash = elem.midHash
+        self.content = elem.content
+        self.ctime = elem.ctime
+        self.weight = elem.weight
+        self.action = elem.action
+        self.pool = elem.pool
+        self.id_str = elem.idStr
+        self.attr = elem.attr
+        self.animation = elem.animation
+        self.colorful = elem.colorful
+        self.cid = elem.cid
+        self.dm_from = elem.dmFrom
+
+    def to_json_dict(self):
+        # 与 protobuf 的 JSON 格式相同，省略默认值字段
+        data = {}
+
+        for (name, attr, convert) in self.json_fields:
+            if value := getattr(self, attr):
+                data[name] = convert(value) if convert else value
+
+        return data
+
+class DanmakuReader:
+    # 将多个分片中的弹幕按出现时间合并，逐条返回
+    # 每个分片为 6 分钟内的弹幕，分片在合并到其时间段时才解析，同一时间只需保留少量分片的弹幕，内存占用与弹幕总数无关
+    segment_duration = 360 * 1000
+
+    def __init__(self, buffers: List[BytesIO]):
+        self.buffers = buffers
+
+    def __iter__(self):
+        heap = []
+        segment_iter_list = []
+
+        counter = itertools.count()
+
+        def open_segment(index: int):
+            segment_iter = iter(self.read_segment(self.buffers[index]))
+
+            segment_iter_list.append(segment_iter)
+
+            push(index)
+
+        def push(index: int):
+            if (record := next(segment_iter_list[index], None)) is not None:
+                # 出现时间相同时按分片顺序，分片内按原有顺序，与整体稳定排序的结果一致
+                heapq.heappush(heap, (record.progress, index, next(counter), record))
+
+        while heap or len(segment_iter_list) < len(self.buffers):
+            next_index = len(segment_iter_list)
+
+            # 当前最早的弹幕已进入下一个分片的时间段时，才开始读取下一个分片
+            if next_index < len(self.buffers) and (not heap or heap[0][0] >= next_index * self.segment_duration):
+                open_segment(next_index)
+                continue
+
+            (progress, index, order, record) = heapq.heappop(heap)
+
+            yield record
+
+            push(index)
+
+    @staticmethod
+    def read_segment(buffer: BytesIO):
+        seg = dm_pb2.DmSegMobileReply()
+        seg.ParseFromString(buffer.getvalue())
+
+        # 忽略没有出现时间的弹幕，分片内按出现时间稳定排序
+        record_list = [DanmakuRecord(elem) for elem in seg.elems if elem.progress]
+        record_list.sort(key = lambda record: record.progress)
+
+        return record_list
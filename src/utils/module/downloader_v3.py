@@ -1,12 +1,13 @@
 import os
 import time
+import requests
 import threading
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from utils.config import Config
 
 from utils.common.exception import GlobalException
-from utils.common.enums import StatusCode
+from utils.common.enums import StatusCode, VerifyStatus
 from utils.common.model.task_info import DownloadTaskInfo
 from utils.common.model.callback import DownloaderCallback
 from utils.common.request import RequestUtils
@@ -14,8 +15,14 @@ from utils.common.thread import Thread
 from utils.common.formatter.formatter import FormatUtils
 from utils.common.formatter.file_name_v2 import FileNameFormatter
 from utils.common.const import Const
+from utils.common.rate_limit import SpeedLimiter
 
 from utils.module.web.cdn import CDN
+from utils.module.web.cdn_score import CDNScoreboard
+from utils.module.web.stream_cache import StreamInfoCache
+from utils.module.scheduler import DownloadScheduler
+from utils.module.resume_journal import ResumeJournal
+from utils.module.md5_verify import MD5Verify, IncrementalMD5
 from utils.module.aria2_downloader import Aria2Downloader
 
 class Utils:
@@ -42,21 +49,100 @@ class Utils:
 
             self.cache[file_name] = {
                 "url": url,
-                "file_size": file_size
+                "file_size": file_size,
+                "md5": self.get_expected_md5(url)
             }
 
         if not self.task_info.total_file_size:
             self.task_info.total_file_size = total_size
+
+    def get_expected_md5(self, url: str):
+        # 获取文件大小时已缓存 ETag，仅在 ETag 为 MD5 时校验
+        if Config.Download.enable_md5_verify and (info := StreamInfoCache.get([url])):
+            return MD5Verify.get_md5_from_etag(info[1].get("etag"))
     
-    def get_file_range_list(self, file_name: str, file_path: str):
-        entry = self.cache.get(file_name)
+    def get_file_range_list(self, downloader_info: dict):
+        file_name, download_type = downloader_info.get("file_name"), downloader_info.get("type")
+
+        file_size = self.cache.get(file_name).get("file_size")
+        file_path = downloader_info.get("file_path")
+
+        journal = ResumeJournal(file_path, file_size)
+
+        if journal.load():
+            # 以日志为准，thread_info 可能记录了尚未落盘的数据
+            if Config.Download.enable_resume_checksum:
+                journal.verify()
+
+            self.task_info.thread_info[download_type] = journal.get_remaining_ranges(self.get_piece_size(file_size))
+
+        elif not os.path.exists(journal.journal_path) and download_type in self.task_info.thread_info and os.path.exists(file_path):
+            # 只有旧版本的任务没有日志，日志损坏时 thread_info 同样不可信，重新下载
+            journal.init_from_ranges(self.task_info.thread_info[download_type])
+
+            self.task_info.thread_info[download_type] = journal.get_remaining_ranges(self.get_piece_size(file_size))
 
-        self.parent.current_file_size = entry.get("file_size")
+        else:
+            self.task_info.thread_info[download_type] = self.calc_file_ranges(file_size)
+
+        self.create_local_file(file_path, file_size)
 
-        self.create_local_file(file_path, self.parent.current_file_size)
+        # 立即写入日志，否则第一次定时同步之前 thread_info 已被保存，崩溃后会按未落盘的进度续传
+        journal.dirty = True
+        journal.sync(force = True)
 
-        if not self.task_info.thread_info:
-            self.task_info.thread_info = self.calc_file_ranges(self.parent.current_file_size)
+        self.parent.journal_dict[download_type] = journal
+
+        if self.cache.get(file_name).get("md5"):
+            self.parent.hasher_dict[download_type] = IncrementalMD5(file_path, journal)
+        else:
+            self.parent.hasher_dict.pop(download_type, None)
+
+    def migrate_thread_info(self):
+        # 旧版本的 thread_info 为列表，仅记录当前正在下载的文件
+        if isinstance(self.task_info.thread_info, list):
+            if self.task_info.thread_info:
+                self.task_info.thread_info = {
+                    self.parent.downloader_info_list[0].get("type"): self.task_info.thread_info
+                }
+            else:
+                self.task_info.thread_info = {}
+
+    def get_active_downloader_info_list(self):
+        if Config.Download.enable_parallel_stream:
+            return self.parent.downloader_info_list.copy()
+        else:
+            return self.parent.downloader_info_list[:1]
+
+    def get_remaining_size(self, downloader_info: dict, file_size: int):
+        range_list = self.task_info.thread_info.get(downloader_info.get("type"))
+
+        if range_list is None:
+            return file_size
+
+        return sum(max(range[1] - range[0] + 1, 0) for range in range_list)
+
+    def sync_downloaded_size(self):
+        # 每个分片的起始位置只由领取它的线程推进，由监听线程统一汇总已下载大小
+        # 停止下载时会清空文件信息缓存，使用副本汇总，缓存缺失时保留上一次汇总的结果
+        cache = self.cache.copy()
+
+        if any(entry.get("file_name") not in cache for entry in self.parent.downloader_info_list):
+            return
+
+        file_size_dict = {entry.get("type"): cache.get(entry.get("file_name")).get("file_size") for entry in self.parent.downloader_info_list}
+
+        total_remaining_size = sum(self.get_remaining_size(entry, file_size_dict.get(entry.get("type"))) for entry in self.parent.downloader_info_list)
+
+        self.task_info.total_downloaded_size = self.task_info.total_file_size - total_remaining_size
+        self.task_info.current_downloaded_size = sum(file_size_dict.get(entry.get("type")) - self.get_remaining_size(entry, file_size_dict.get(entry.get("type"))) for entry in self.parent.active_info_list)
+
+    def is_active_download_complete(self):
+        for entry in self.parent.active_info_list:
+            if self.task_info.thread_info.get(entry.get("type")):
+                return False
+
+        return True
 
     def calc_file_ranges(self, file_size: int):
         piece_size = self.get_piece_size(file_size)
@@ -86,26 +172,101 @@ class Utils:
                 f.write(b"\0")
 
     def retry_download(self, e):
-        self.parent.retry_times += 1
+        with self.parent.lock:
+            # 其他线程已经终止了下载，不再重复报错
+            if self.parent.stop_event.is_set():
+                return
 
-        if self.parent.retry_times > Config.Advanced.download_error_retry_count:
-            self.parent.stop_event.set()
+            self.parent.retry_times += 1
+
+            if self.parent.retry_times > Config.Advanced.download_error_retry_count:
+                code = StatusCode.MaxRetry.value
+
+            elif not Config.Advanced.retry_when_download_error:
+                code = StatusCode.DownloadError.value
+
+            else:
+                return
 
-            raise GlobalException(code = StatusCode.MaxRetry.value, callback = self.onDownloadError) from e
-        
-        elif not Config.Advanced.retry_when_download_error:
             self.parent.stop_event.set()
 
-            raise GlobalException(code = StatusCode.DownloadError.value, callback = self.onDownloadError) from e
-        
-        self.parent.start_next_thread()
+        raise GlobalException(code = code, callback = self.onDownloadError) from e
+
+    def check_range_complete(self, downloader_info: dict, range: list, stop_event: threading.Event):
+        with self.parent.lock:
+            # 下载已被停止或重新开始，thread_info 可能已被替换，不再修改
+            if stop_event.is_set():
+                return
+
+            if range[0] > range[1]:
+                range_list = self.task_info.thread_info.get(downloader_info.get("type"))
+
+                # 按对象移除，内容相同的其他分片不受影响
+                if range_list is not None:
+                    for index, entry in enumerate(range_list):
+                        if entry is range:
+                            del range_list[index]
+                            break
+
+            else:
+                # 分片未下载完成，放回队列等待重新下载
+                self.parent.range_queue.insert(0, (downloader_info, range))
+
+    def get_thread_count(self):
+        return max(min(Config.Download.thread_count, len(self.parent.range_queue)), 1)
 
     def reset_flag(self):
-        self.parent.stop_event.clear()
+        # 每次开始下载都使用新的事件，避免上一次残留的线程继续写入
+        self.parent.stop_event = threading.Event()
 
         self.parent.retry_times = 0
         self.parent.suspend_interval = 0
 
+    def sync_journal(self, force: bool = False):
+        for journal in list(self.parent.journal_dict.values()):
+            journal.sync(force)
+
+    def verify_download(self):
+        # 校验下载完成的文件，返回 False 表示有数据块需要重新下载
+        refetch = False
+
+        for entry in self.parent.active_info_list:
+            # 停止下载时会清空文件信息缓存
+            download_type, md5 = entry.get("type"), (self.cache.get(entry.get("file_name")) or {}).get("md5")
+
+            if not (hasher := self.parent.hasher_dict.get(download_type)):
+                self.task_info.verify_info[download_type] = {"status": VerifyStatus.Skipped.value}
+                continue
+
+            # 校验过程中下载被停止，不判定结果
+            if md5 is None:
+                return False
+
+            if hasher.hexdigest() == md5:
+                status = VerifyStatus.Passed.value
+
+            elif download_type not in self.parent.verify_retry_set:
+                # 只重新下载 crc32 不符的块，无法定位时重新下载整个文件，每个文件只重试一次
+                journal = self.parent.journal_dict.get(download_type)
+
+                journal.clear_blocks(journal.get_corrupt_blocks() or list(range(journal.block_count)))
+                journal.sync(force = True)
+
+                self.parent.verify_retry_set.add(download_type)
+
+                refetch = True
+                continue
+
+            else:
+                status = VerifyStatus.Failed.value
+
+            self.task_info.verify_info[download_type] = {"md5": md5, "status": status}
+
+        if refetch:
+            Thread(target = self.parent.start_download).start()
+
+        return not refetch
+
     def update_download_progress(self, progress: int = None, speed: str = None):
         if self.parent.stop_event.is_set():
             return
@@ -113,26 +274,24 @@ class Utils:
         if progress:
             self.task_info.progress = int(progress)
 
-        if self.task_info.thread_info:
-            self.task_info.thread_info[0] = self.parent.current_thread_info
-
-        self.task_info.update()
+        self.task_info.update_progress()
 
         if speed:
             self.parent.callback.onDownloading(speed)
 
-    def update_thread_info(self, chunk_size: int):
-        self.task_info.current_downloaded_size += chunk_size
-        self.task_info.total_downloaded_size += chunk_size
-        self.parent.current_thread_info[0] += chunk_size
+    def check_response(self, url: str, req: requests.Response):
+        if req.status_code == 403:
+            # 链接已失效，清除缓存，重新下载时重新获取
+            StreamInfoCache.invalidate(url)
 
-    def check_speed_limit(self, start_time: float):
-        if Config.Download.enable_speed_limit:
-            elapsed_time = time.time() - start_time
-            expected_time = self.task_info.current_downloaded_size / self.speed_bps
+        req.raise_for_status()
 
-            if elapsed_time < expected_time:
-                time.sleep(expected_time - elapsed_time)
+    def record_throughput(self, url: str, start_time: float, downloaded_size: int):
+        elapsed_time = time.time() - start_time
+
+        # 下载量过小时速度误差较大，不计入
+        if downloaded_size >= Const.Size_1MB and elapsed_time > 0 and not Config.Download.enable_speed_limit:
+            CDNScoreboard.record_throughput(url, downloaded_size / elapsed_time)
 
     def check_speed_suspend(self, speed: int):
         if Config.Advanced.retry_when_download_suspend:
@@ -146,13 +305,6 @@ class Utils:
 
             Thread(target = self.restart_download).start()
 
-    def update_start_time(self):
-        if Config.Download.enable_speed_limit:
-            if self.task_info.current_downloaded_size:
-                return time.time() - self.task_info.current_downloaded_size / self.speed_bps
-            else:
-                return time.time()
-
     def restart_download(self):
         time.sleep(1)
 
@@ -163,10 +315,6 @@ class Utils:
 
         self.parent.callback.onError()
 
-    @property
-    def speed_bps(self):
-        return Config.Download.speed_mbps * 1024 * 1024
-    
 class Downloader:
     def __init__(self, task_info: DownloadTaskInfo, callback: DownloaderCallback):
         self.task_info = task_info
@@ -185,12 +333,13 @@ class Downloader:
 
         self.retry_times: int = 0
         self.suspend_interval: int = 0
-        self.current_file_size: int = 0
-        self.current_thread_info: list = []
-        self.download_type: str = ""
-
-        self.url: str = ""
-        self.file_path: str = ""
+        self.active_info_list: List[dict] = []
+        self.range_queue: List[Tuple[dict, list]] = []
+        self.worker_count: int = 0
+        self.journal_dict: Dict[str, ResumeJournal] = {}
+        self.hasher_dict: Dict[str, IncrementalMD5] = {}
+        # 校验失败后已重新下载过的文件
+        self.verify_retry_set: set = set()
 
         self.download_path = FileNameFormatter.get_download_path(self.task_info)
         
@@ -217,20 +366,23 @@ class Downloader:
                 # 回退到原生下载
                 self.aria2_downloader = None
         
-        # 原生下载逻辑
-        downloader_info = self.downloader_info_list[:1][0]
+        # 原生下载逻辑，开启并行下载时，音视频流同时下载
+        self.active_info_list = self.utils.get_active_downloader_info_list()
 
-        self.download_type = downloader_info.get("type")
-
-        file_name = downloader_info.get("file_name")
-        self.file_path = os.path.join(self.download_path, file_name)
         self.utils.reset_flag()
 
         try:
             self.utils.get_total_file_size()
 
-            self.url = self.utils.cache.get(file_name).get("url")
-            self.utils.get_file_range_list(file_name, self.file_path)
+            self.utils.migrate_thread_info()
+
+            for entry in self.active_info_list:
+                entry["file_path"] = os.path.join(self.download_path, entry.get("file_name"))
+                entry["url"] = self.utils.cache.get(entry.get("file_name")).get("url")
+
+                self.utils.get_file_range_list(entry)
+
+            self.utils.sync_downloaded_size()
 
             self.callback.onStart()
 
@@ -243,40 +395,91 @@ class Downloader:
 
     def start_next_thread(self):
         if not self.stop_event.is_set():
-            if self.current_thread_info and self.current_thread_info[0] >= self.current_thread_info[1]:
-                del self.task_info.thread_info[:1]
+            with self.lock:
+                # 停止下载时刚好完成的分片不会被移除，在此清理，否则无法判断下载完成
+                for entry in self.active_info_list:
+                    range_list = self.task_info.thread_info.get(entry.get("type"))
+
+                    range_list[:] = [range for range in range_list if range[0] <= range[1]]
+
+                self.range_queue = [(entry, range) for entry in self.active_info_list for range in self.task_info.thread_info.get(entry.get("type"))]
 
-            range = self.task_info.thread_info[:1]
+            self.worker_count = self.utils.get_thread_count()
 
-            for entry in range:
-                self.current_thread_info = entry
+            # 多个连接同时从队列中领取分片，写入预分配文件的不同位置
+            for index in range(self.worker_count):
+                Thread(target = self.range_worker, args = (self.stop_event, )).start()
+
+    def range_worker(self, stop_event: threading.Event):
+        # 每个线程复用同一块缓冲区，避免逐块分配内存
+        buffer = bytearray(self.buffer_size)
+
+        while not stop_event.is_set():
+            with self.lock:
+                if not self.range_queue:
+                    break
+
+                downloader_info, range = self.range_queue.pop(0)
+
+            self.range_download(downloader_info, range, stop_event, buffer)
+
+    def range_download(self, downloader_info: dict, range: list, stop_event: threading.Event, buffer: bytearray):
+        url, file_path = downloader_info.get("url"), downloader_info.get("file_path")
+        journal = self.journal_dict.get(downloader_info.get("type"))
+        hasher = self.hasher_dict.get(downloader_info.get("type"))
+
+        view = memoryview(buffer)
+
+        # 同一主机的连接数由调度器统一限制
+        if not DownloadScheduler.acquire_connection(url, stop_event):
+            return
 
-                self.range_download(self.url, self.file_path, self.current_thread_info)
+        start_time, downloaded_size = time.time(), 0
 
-    def range_download(self, url: str, file_path: str, range: list):
         try:
-            with open(file_path, "r+b") as f:
+            with open(file_path, "r+b", buffering = 0) as f:
                 f.seek(range[0])
 
-                start_time = self.utils.update_start_time()
-
                 with RequestUtils.request_get(url, headers = RequestUtils.get_headers(referer_url = self.task_info.referer_url, sessdata = Config.User.SESSDATA, range = range), stream = True) as req:
-                    for chunk in req.iter_content(chunk_size = 2048):
-                        if chunk:
-                            with self.lock:
-                                if self.stop_event.is_set():
-                                    break
+                    self.utils.check_response(url, req)
+
+                    # 写入过程不加锁，分片只由当前线程推进，进度由监听线程汇总
+                    while not stop_event.is_set() and range[0] <= range[1]:
+                        size = req.raw.readinto(view[:min(self.buffer_size, range[1] - range[0] + 1)])
+
+                        if not size:
+                            break
+
+                        # 无缓冲写入可能只写入一部分，写完整个分块后才记录进度
+                        written = 0
 
-                                f.write(chunk)
+                        while written < size:
+                            written += f.write(view[written:size])
 
-                                self.utils.update_thread_info(len(chunk))
+                        journal.update(range[0], view[:size])
 
-                                self.utils.check_speed_limit(start_time)
+                        if hasher:
+                            hasher.update(range[0], view[:size])
+
+                        range[0] += size
+                        downloaded_size += size
+
+                        # 全局限速按任务平均分配，等待时不持有任何锁
+                        SpeedLimiter.consume(size, key = self.task_info.id)
 
         except Exception as e:
             self.utils.retry_download(e)
 
-        self.start_next_thread()
+        finally:
+            DownloadScheduler.release_connection(url)
+
+            self.utils.record_throughput(url, start_time, downloaded_size)
+
+        self.utils.check_range_complete(downloader_info, range, stop_event)
+
+    @property
+    def buffer_size(self):
+        return 256 * Const.Size_1KB
 
     def stop_download(self):
         self.stop_event.set()
@@ -288,29 +491,60 @@ class Downloader:
             self.aria2_downloader.stop_download()
 
     def listener(self):
-        while self.task_info.current_downloaded_size < self.current_file_size and not self.stop_event.is_set():
-            temp_downloaded_size = self.task_info.current_downloaded_size
+        stop_event = self.stop_event
 
-            time.sleep(1)
+        try:
+            while not self.utils.is_active_download_complete() and not stop_event.is_set():
+                temp_downloaded_size = self.task_info.total_downloaded_size
 
-            with self.lock:
-                speed = self.task_info.current_downloaded_size - temp_downloaded_size
-                total_progress = (self.task_info.total_downloaded_size / self.task_info.total_file_size) * 100
+                time.sleep(1)
 
-                self.utils.update_download_progress(total_progress, FormatUtils.format_speed(speed))
+                # 等待期间下载已被停止，文件信息缓存可能已被清空
+                if stop_event.is_set():
+                    break
 
-                self.utils.check_speed_suspend(speed)
+                with self.lock:
+                    self.utils.sync_downloaded_size()
 
-        if not self.stop_event.is_set():
-            self.download_complete()
+                    # 所有同时下载的文件共用一个速度和进度
+                    speed = self.task_info.total_downloaded_size - temp_downloaded_size
+                    total_progress = (self.task_info.total_downloaded_size / self.task_info.total_file_size) * 100
+
+                    self.utils.update_download_progress(total_progress, FormatUtils.format_speed(speed))
+
+                    self.utils.check_speed_suspend(speed)
+
+                self.utils.sync_journal()
+
+                # 下载线程只记录节点速度，由监听线程定时保存
+                CDNScoreboard.save()
+
+        finally:
+            # 无论暂停、出错还是下载完成，退出循环时都立即写入日志，下次从已落盘的位置继续
+            self.utils.sync_journal(force = True)
+
+        if not stop_event.is_set():
+            with self.lock:
+                self.utils.sync_downloaded_size()
+
+            if self.utils.verify_download():
+                self.download_complete()
 
     def download_complete(self):
-        self.task_info.download_items.remove(self.download_type)
-        self.task_info.current_downloaded_size = 0
-        self.task_info.thread_info.clear()
-        self.current_thread_info.clear()
+        for entry in self.active_info_list:
+            self.task_info.download_items.remove(entry.get("type"))
+            self.task_info.thread_info.pop(entry.get("type"), None)
+
+            if journal := self.journal_dict.pop(entry.get("type"), None):
+                journal.remove()
 
-        del self.downloader_info_list[:1]
+            self.hasher_dict.pop(entry.get("type"), None)
+
+            self.downloader_info_list.remove(entry)
+
+        self.task_info.current_downloaded_size = 0
+        self.active_info_list.clear()
+        self.range_queue.clear()
 
         self.utils.update_download_progress()
 
@@ -11,6 +11,7 @@ from utils.common.model.callback import Callback
 
 from utils.module.ffmpeg.command import FFCommand
 from utils.module.ffmpeg.prop import FFProp
+from utils.module.resume_journal import ResumeJournal
 
 class FFUtils:
     @staticmethod
@@ -81,4 +82,7 @@ class FFUtils:
             case StreamType.Mp4:
                 temp_files.append(prop.video_temp_file())
 
+        # 断点续传日志
+        temp_files.extend([ResumeJournal.get_journal_path(file) for file in temp_files])
+
         Thread(target = File.remove_files_ex, args = (temp_files, task_info.download_path)).start()
\ No newline at end of file
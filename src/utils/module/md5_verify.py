@@ -1,20 +1,86 @@
 import re
 import hashlib
+import threading
+
+from utils.common.const import Const
 
 class MD5Verify:
+    @staticmethod
     def get_md5_from_etag(etag: str) -> str | None:
+        # ETag 为 32 位十六进制字符串时才是文件的 MD5，可能带有引号
+        # 弱校验的 ETag 不保证内容逐字节相同，不用于校验
         if etag:
-            if len(etag) == 18 and '"' in etag:
-                result = re.findall(r'\w+', etag)
+            result = re.fullmatch(r'"?([0-9a-fA-F]{32})"?', etag.strip())
+
+            if result:
+                return result.group(1).lower()
 
-                if result:
-                    return result[0]
-        
+    @staticmethod
     def verify_md5(md5_value: str, file_path: str):
         md5 = hashlib.md5()
 
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            for chunk in iter(lambda: f.read(Const.Size_1MB), b""):
                 md5.update(chunk)
-        
-        return md5_value.lower() == md5.hexdigest()
\ No newline at end of file
+
+        return md5_value.lower() == md5.hexdigest()
+
+class IncrementalMD5:
+    # 下载过程中按顺序计算 MD5，下载线程写入数据后直接计算，下载完成时只需计算剩余的少量数据
+    # 分片并行下载时，只有写入位置恰好衔接的数据直接计算，其余的数据在前面的块都已写入后再从文件中读取
+    def __init__(self, file_path: str, journal):
+        from utils.module.resume_journal import ResumeJournal
+
+        self.file_path = file_path
+        self.journal: ResumeJournal = journal
+
+        self.md5 = hashlib.md5()
+
+        # 下一个需要计算的位置
+        self.position = 0
+
+        self.lock = threading.Lock()
+
+    def update(self, offset: int, data: memoryview):
+        # 由下载线程在写入文件后调用，其他线程正在计算时直接跳过，不阻塞下载，跳过的数据之后从文件中读取
+        if not self.lock.acquire(blocking = False):
+            return
+
+        try:
+            self.read_complete_blocks(offset)
+
+            end = offset + len(data)
+
+            if offset <= self.position < end:
+                self.md5.update(data[self.position - offset:])
+
+                self.position = end
+
+        finally:
+            self.lock.release()
+
+    def read_complete_blocks(self, limit: int):
+        # 从文件中读取已写入但尚未计算的部分，只读取日志中已完成的块
+        if self.position >= limit:
+            return
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.position)
+
+            while self.position < limit:
+                block = self.position // self.journal.block_size
+
+                if block >= self.journal.block_count or not self.journal.is_block_complete(block):
+                    break
+
+                length = min(block * self.journal.block_size + self.journal.get_block_length(block), limit) - self.position
+
+                self.md5.update(f.read(length))
+
+                self.position += length
+
+    def hexdigest(self):
+        with self.lock:
+            self.read_complete_blocks(self.journal.file_size)
+
+        return self.md5.hexdigest()
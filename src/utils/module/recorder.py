@@ -15,6 +15,7 @@ from utils.common.io.directory import Directory
 from utils.common.enums import LiveFileSplit
 from utils.common.datetime_util import DateTime
 from utils.common.const import Const
+from utils.common.rate_limit import SpeedLimiter
 
 class Utils:
     def __init__(self, parent):
@@ -138,6 +139,8 @@ class Recorder:
 
                         self.utils.update_recording_progress(len(chunk))
 
+                    SpeedLimiter.consume(len(chunk), key = self)
+
     def stop_recording(self):
         self.stop_event.set()
 
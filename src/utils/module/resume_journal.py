@@ -0,0 +1,206 @@
+import os
+import json
+import math
+import time
+import zlib
+import base64
+import threading
+from typing import Dict, List
+
+from utils.config import Config
+
+from utils.common.const import Const
+
+class ResumeJournal:
+    # 断点续传日志，按固定大小的块记录已写入磁盘的数据
+    # 同步时先 fsync 数据文件再写入日志，崩溃后日志中标记完成的块一定有效，未标记的块重新下载
+    block_size = Const.Size_1MB
+
+    # 日志同步间隔，单位秒
+    sync_interval = 5
+
+    suffix = ".journal"
+
+    def __init__(self, file_path: str, file_size: int):
+        self.file_path = file_path
+        self.journal_path = self.get_journal_path(file_path)
+        self.file_size = file_size
+
+        self.block_count = math.ceil(file_size / self.block_size)
+        self.bitmap = bytearray(math.ceil(self.block_count / 8))
+
+        # 已完成块的 crc32，仅在开启校验时记录，完整性校验失败时据此定位需要重新下载的块
+        self.record_checksum = Config.Download.enable_resume_checksum or Config.Download.enable_md5_verify
+        self.checksum_dict: Dict[int, int] = {}
+        # 正在写入的块已计算的 crc32，每个块只会由一个线程按顺序写入
+        self.pending_checksum_dict: Dict[int, int] = {}
+
+        self.lock = threading.Lock()
+
+        self.dirty = False
+        self.last_sync_time = time.monotonic()
+
+    def load(self):
+        # 读取已有的日志，数据文件不存在或大小不符时视为无效
+        if not os.path.exists(self.file_path) or not os.path.exists(self.journal_path):
+            return False
+
+        try:
+            with open(self.journal_path, "r", encoding = "utf-8") as f:
+                data = json.loads(f.read())
+
+            if data["file_size"] != self.file_size or data["block_size"] != self.block_size:
+                return False
+
+            self.bitmap = bytearray(base64.b64decode(data["bitmap"]))
+            self.checksum_dict = {int(key): value for key, value in data.get("checksum", {}).items()}
+
+            return len(self.bitmap) == math.ceil(self.block_count / 8)
+
+        except Exception:
+            # 日志已损坏，重新下载
+            self.bitmap = bytearray(math.ceil(self.block_count / 8))
+            self.checksum_dict.clear()
+
+            return False
+
+    def init_from_ranges(self, range_list: List[list]):
+        # 旧版本没有日志，以 thread_info 中未下载的分片为准，分片起始位置对齐到块
+        remaining = bytearray(self.block_count)
+
+        for start, end in range_list:
+            if start <= end:
+                for block in range(start // self.block_size, end // self.block_size + 1):
+                    remaining[block] = 1
+
+        for block in range(self.block_count):
+            if not remaining[block]:
+                self.set_block(block)
+
+        self.dirty = True
+
+    def verify(self):
+        # 校验已完成的块，内容与记录的 crc32 不符时重新下载该块
+        self.clear_blocks(self.get_corrupt_blocks())
+
+    def get_corrupt_blocks(self):
+        corrupt_list = []
+
+        with open(self.file_path, "rb") as f:
+            for block in range(self.block_count):
+                if self.is_block_complete(block) and block in self.checksum_dict:
+                    f.seek(block * self.block_size)
+
+                    if zlib.crc32(f.read(self.get_block_length(block))) != self.checksum_dict[block]:
+                        corrupt_list.append(block)
+
+        return corrupt_list
+
+    def clear_blocks(self, block_list: List[int]):
+        if block_list:
+            with self.lock:
+                for block in block_list:
+                    self.clear_block(block)
+
+                self.dirty = True
+
+    def update(self, offset: int, data: memoryview):
+        # 写入文件后调用，数据写满一个块时标记该块完成
+        position, end = offset, offset + len(data)
+
+        while position < end:
+            block = position // self.block_size
+            block_end = min((block + 1) * self.block_size, self.file_size)
+
+            length = min(block_end, end) - position
+
+            if self.record_checksum:
+                self.pending_checksum_dict[block] = zlib.crc32(data[position - offset:position - offset + length], self.pending_checksum_dict.get(block, 0))
+
+            position += length
+
+            if position == block_end:
+                with self.lock:
+                    self.set_block(block)
+
+                    if (checksum := self.pending_checksum_dict.pop(block, None)) is not None:
+                        self.checksum_dict[block] = checksum
+
+                    self.dirty = True
+
+    def sync(self, force: bool = False):
+        # 由监听线程定时调用
+        if not self.dirty or (not force and time.monotonic() - self.last_sync_time < self.sync_interval):
+            return
+
+        with self.lock:
+            bitmap = bytes(self.bitmap)
+            checksum_dict = self.checksum_dict.copy()
+
+            self.dirty = False
+
+        # 必须先同步数据文件，保证日志中记录的块已经落盘
+        with open(self.file_path, "r+b") as f:
+            os.fsync(f.fileno())
+
+        temp_path = f"{self.journal_path}.tmp"
+
+        with open(temp_path, "w", encoding = "utf-8") as f:
+            f.write(json.dumps({
+                "file_size": self.file_size,
+                "block_size": self.block_size,
+                "bitmap": base64.b64encode(bitmap).decode("utf-8"),
+                "checksum": checksum_dict
+            }))
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        # 替换是原子操作，不会留下写了一半的日志
+        os.replace(temp_path, self.journal_path)
+
+        self.last_sync_time = time.monotonic()
+
+    def remove(self):
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def get_remaining_ranges(self, piece_size: int):
+        # 将未完成的连续块合并为分片，过长的按 piece_size 拆分，便于多线程同时下载
+        range_list = []
+        block = 0
+
+        while block < self.block_count:
+            if self.is_block_complete(block):
+                block += 1
+                continue
+
+            start = block * self.block_size
+
+            while block < self.block_count and not self.is_block_complete(block):
+                block += 1
+
+            end = min(block * self.block_size, self.file_size) - 1
+
+            for piece_start in range(start, end + 1, piece_size):
+                range_list.append([piece_start, min(piece_start + piece_size - 1, end)])
+
+        return range_list
+
+    def is_block_complete(self, block: int):
+        return bool(self.bitmap[block // 8] & (1 << (block % 8)))
+
+    def set_block(self, block: int):
+        self.bitmap[block // 8] |= 1 << (block % 8)
+
+    def clear_block(self, block: int):
+        self.bitmap[block // 8] &= ~(1 << (block % 8)) & 0xFF
+
+        self.checksum_dict.pop(block, None)
+
+    def get_block_length(self, block: int):
+        return min(self.block_size, self.file_size - block * self.block_size)
+
+    @classmethod
+    def get_journal_path(cls, file_path: str):
+        return f"{file_path}{cls.suffix}"
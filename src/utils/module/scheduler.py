@@ -0,0 +1,113 @@
+import threading
+from typing import Callable, Dict, Set
+from urllib.parse import urlparse
+
+from utils.config import Config
+
+class ScheduleEntry:
+    __slots__ = ("id", "priority", "order", "start")
+
+    def __init__(self, id: int, priority: int, order: int, start: Callable):
+        self.id = id
+        self.priority = priority
+        # 优先级相同时按添加顺序启动，一般为任务的时间戳
+        self.order = order
+        self.start = start
+
+    def get_sort_key(self):
+        return (-self.priority, self.order)
+
+class DownloadScheduler:
+    # 下载调度器，统一决定任务的启动顺序和同一主机的连接数，不依赖界面，限速由 SpeedLimiter 按任务平均分配
+    lock = threading.RLock()
+
+    # 等待启动的任务
+    waiting_dict: Dict[int, ScheduleEntry] = {}
+    # 正在下载的任务
+    running_set: Set[int] = set()
+
+    host_condition = threading.Condition()
+    host_connection_dict: Dict[str, int] = {}
+
+    @classmethod
+    def submit(cls, id: int, priority: int, order: int, start: Callable):
+        # 添加等待启动的任务，start 由调度器在有空闲位置时调用
+        with cls.lock:
+            if id not in cls.running_set:
+                cls.waiting_dict[id] = ScheduleEntry(id, priority, order, start)
+
+    @classmethod
+    def set_priority(cls, id: int, priority: int):
+        with cls.lock:
+            if entry := cls.waiting_dict.get(id):
+                entry.priority = priority
+
+    @classmethod
+    def mark_running(cls, id: int):
+        # 手动开始的任务不经过等待队列，也计入正在下载的数量
+        with cls.lock:
+            cls.waiting_dict.pop(id, None)
+            cls.running_set.add(id)
+
+    @classmethod
+    def remove(cls, id: int):
+        # 任务暂停、出错、下载完成或被删除时调用，空出的位置交给下一个任务
+        with cls.lock:
+            cls.waiting_dict.pop(id, None)
+            cls.running_set.discard(id)
+
+        cls.schedule()
+
+    @classmethod
+    def clear_waiting(cls):
+        with cls.lock:
+            cls.waiting_dict.clear()
+
+    @classmethod
+    def schedule(cls):
+        start_list = []
+
+        with cls.lock:
+            while cls.waiting_dict and len(cls.running_set) < Config.Download.max_download_count:
+                entry = min(cls.waiting_dict.values(), key = ScheduleEntry.get_sort_key)
+
+                del cls.waiting_dict[entry.id]
+                cls.running_set.add(entry.id)
+
+                start_list.append(entry)
+
+        # 回调在锁外调用，回调中可以再次访问调度器
+        for entry in start_list:
+            entry.start()
+
+    @classmethod
+    def acquire_connection(cls, url: str, stop_event: threading.Event):
+        # 同一主机的连接数达到上限时等待，任务停止时放弃等待并返回 False
+        host = cls.get_host(url)
+
+        with cls.host_condition:
+            while cls.host_connection_dict.get(host, 0) >= Config.Download.max_connection_per_host:
+                if stop_event.is_set():
+                    return False
+
+                cls.host_condition.wait(timeout = 1)
+
+            cls.host_connection_dict[host] = cls.host_connection_dict.get(host, 0) + 1
+
+        return True
+
+    @classmethod
+    def release_connection(cls, url: str):
+        host = cls.get_host(url)
+
+        with cls.host_condition:
+            cls.host_connection_dict[host] -= 1
+
+            if not cls.host_connection_dict[host]:
+                del cls.host_connection_dict[host]
+
+            cls.host_condition.notify()
+
+    @staticmethod
+    def get_host(url: str):
+        return urlparse(url).netloc
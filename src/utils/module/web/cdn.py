@@ -1,12 +1,20 @@
+import time
 from typing import List
 from urllib.parse import urlparse, urlunparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from utils.config import Config
 from utils.common.request import RequestUtils
 
+from utils.module.web.cdn_score import CDNScoreboard
+from utils.module.web.stream_cache import StreamInfoCache
+
 class CDN:
     bilibili_url = "https://www.bilibili.com/"
 
+    # 同时探测的最大链接数
+    max_probe_workers = 6
+
     @staticmethod
     def replace_host(url: str, cdn_host: str):
         parsed_url = urlparse(url)._replace(netloc = cdn_host)
@@ -20,55 +28,86 @@ class CDN:
 
     @classmethod
     def get_file_size(cls, url_list: List[str]):
-        for download_url in url_list:
-            if cdn_host_list := cls.get_cdn_host_list():
-                for cdn_host in cdn_host_list:
-                    new_url = CDN.replace_host(download_url, cdn_host)
+        if info := cls.get_cached_file_size(url_list):
+            return info
 
-                    file_size = cls.request_head(new_url)
+        if cdn_host_list := cls.get_cdn_host_list():
+            url_candidate_list = [cls.replace_host(download_url, cdn_host) for cdn_host in CDNScoreboard.sort_host_list(cdn_host_list) for download_url in url_list]
 
-                    if file_size:
-                        return (new_url, file_size)
-            else:
-                file_size = cls.request_head(download_url)
+            if info := cls.race(url_candidate_list):
+                return info
 
-                if file_size:
-                    return (download_url, file_size)
-                
-        # 未通过 CDN 获取到有效文件大小，尝试不使用 CDN 直连获取
-        if Config.Advanced.enable_switch_cdn:
-            for download_url in url_list:
-                file_size = cls.request_head(download_url)
-
-                if file_size:
-                    return (download_url, file_size)
+        # 未启用 CDN 替换，或未通过 CDN 获取到有效文件大小时，直连获取
+        return cls.race(url_list)
                 
     @classmethod
     def get_file_size_ex(cls, url_list: List[str]):
-        for download_url in url_list:
-            file_size = cls.request_head(download_url)
+        if info := cls.get_cached_file_size(url_list):
+            return info
 
-            if file_size:
-                return (download_url, file_size)
+        if info := cls.race(url_list):
+            return info
             
         return cls.get_file_size(url_list)
 
+    @classmethod
+    def race(cls, url_list: List[str]):
+        # 同时探测多个链接，最先返回有效文件大小的链接胜出
+        if not url_list:
+            return None
+
+        executor = ThreadPoolExecutor(max_workers = min(len(url_list), cls.max_probe_workers))
+
+        try:
+            future_list = [executor.submit(cls.probe, url) for url in url_list]
+
+            for future in as_completed(future_list):
+                url, file_size, etag = future.result()
+
+                if file_size:
+                    StreamInfoCache.set(url, file_size, etag)
+
+                    return (url, file_size)
+
+        finally:
+            executor.shutdown(wait = False, cancel_futures = True)
+
+            CDNScoreboard.save()
+
+    @classmethod
+    def get_cached_file_size(cls, url_list: List[str]):
+        if info := StreamInfoCache.get(url_list):
+            url, entry = info
+
+            # 沿用缓存中选定的节点，签名参数使用当前链接的
+            return (cls.replace_host(url, entry.get("host")), entry.get("file_size"))
+
+    @classmethod
+    def probe(cls, url: str):
+        start_time = time.time()
+
+        file_size, etag = cls.request_head(url)
+
+        CDNScoreboard.record_probe(url, time.time() - start_time, bool(file_size))
+
+        return (url, file_size, etag)
+
     @staticmethod
     def request_head(url: str):
         try:
-            req = RequestUtils.request_head(url, headers = RequestUtils.get_headers(referer_url = CDN.bilibili_url))
+            req = RequestUtils.request_head(url, headers = RequestUtils.get_headers(referer_url = CDN.bilibili_url), retry = False)
             
         except Exception:
-            return 0
+            return 0, None
 
         if req.status_code not in (200, 206):
             # 非成功状态码视为无效
-            return 0
+            return 0, None
         
         length = req.headers.get("Content-Length", 0)
 
         if int(length) < 1024:
             # 小于 1KB 的文件大小视为无效
-            return 0
+            return 0, None
 
-        return int(length)
\ No newline at end of file
+        return int(length), req.headers.get("ETag")
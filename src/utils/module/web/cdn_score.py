@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import threading
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from utils.config import Config
+from utils.common.const import Const
+
+class CDNScoreboard:
+    # 记录每个 CDN 节点的延迟、失败率和下载速度，持久化保存，用于后续任务优先选择可用节点
+    lock = threading.Lock()
+    # 多个下载线程可能同时保存，文件按顺序写入
+    save_lock = threading.Lock()
+
+    score_dict: Dict[str, dict] = {}
+
+    # 平滑系数，新数据所占的权重
+    alpha = 0.3
+    # 未探测过的节点默认延迟，单位秒
+    default_latency = 0.5
+    # 保存间隔，单位秒
+    save_interval = 10
+
+    loaded = False
+    dirty = False
+    last_save_time = 0
+
+    @classmethod
+    def record_probe(cls, url: str, latency: float, success: bool):
+        with cls.lock:
+            entry = cls.get_entry(url)
+
+            if success:
+                entry["success"] += 1
+                entry["latency"] = cls.smooth(entry["latency"], latency)
+            else:
+                entry["failure"] += 1
+
+            cls.dirty = True
+
+    @classmethod
+    def record_throughput(cls, url: str, speed: float):
+        with cls.lock:
+            entry = cls.get_entry(url)
+
+            entry["throughput"] = cls.smooth(entry["throughput"], speed)
+
+            cls.dirty = True
+
+    @classmethod
+    def sort_host_list(cls, host_list: List[str]):
+        with cls.lock:
+            cls.load()
+
+            # 排序是稳定的，分数相同时保持用户设置的优先级顺序
+            return sorted(host_list, key = cls.get_score)
+
+    @classmethod
+    def get_score(cls, host: str):
+        # 分数为预计获取 1MB 数据所需的时间除以成功率，越小越好
+        entry = cls.score_dict.get(host, {})
+
+        success, failure = entry.get("success", 0), entry.get("failure", 0)
+        latency, throughput = entry.get("latency") or cls.default_latency, entry.get("throughput")
+
+        success_rate = (success + 1) / (success + failure + 2)
+        transfer_time = Const.Size_1MB / throughput if throughput else 0
+
+        return (latency + transfer_time) / success_rate
+
+    @classmethod
+    def get_entry(cls, url: str):
+        cls.load()
+
+        host = urlparse(url).netloc
+
+        if host not in cls.score_dict:
+            cls.score_dict[host] = {
+                "latency": 0,
+                "throughput": 0,
+                "success": 0,
+                "failure": 0
+            }
+
+        return cls.score_dict[host]
+
+    @classmethod
+    def smooth(cls, old_value: float, new_value: float):
+        if old_value:
+            return old_value * (1 - cls.alpha) + new_value * cls.alpha
+        else:
+            return new_value
+
+    @classmethod
+    def load(cls):
+        if not cls.loaded:
+            cls.loaded = True
+
+            try:
+                with open(Config.APP.cdn_score_file_path, "r", encoding = "utf-8") as f:
+                    cls.score_dict = json.load(f).get("score", {})
+
+            except Exception:
+                cls.score_dict = {}
+
+    @classmethod
+    def save(cls, force: bool = False):
+        with cls.save_lock:
+            with cls.lock:
+                if not cls.dirty or (not force and time.time() - cls.last_save_time < cls.save_interval):
+                    return
+
+                contents = json.dumps({"score": cls.score_dict}, ensure_ascii = False, indent = 4)
+
+                cls.dirty = False
+                cls.last_save_time = time.time()
+
+            temp_path = f"{Config.APP.cdn_score_file_path}.tmp"
+
+            try:
+                with open(temp_path, "w", encoding = "utf-8") as f:
+                    f.write(contents)
+
+                # 先写入临时文件再替换，程序退出时不会留下写了一半的文件
+                os.replace(temp_path, Config.APP.cdn_score_file_path)
+
+            except OSError:
+                # 评分只用于选择节点，保存失败不影响下载，下次保存时重试
+                with cls.lock:
+                    cls.dirty = True
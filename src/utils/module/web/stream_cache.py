@@ -0,0 +1,61 @@
+import time
+import threading
+from typing import Dict, List
+from urllib.parse import urlparse, parse_qs
+
+class StreamInfoCache:
+    # 缓存音视频流的文件大小、所选节点和 ETag，预览和下载阶段共用，避免重复发送 HEAD 请求
+    lock = threading.Lock()
+
+    cache_dict: Dict[str, dict] = {}
+
+    # 链接未携带过期时间时的默认有效期，单位秒
+    default_ttl = 600
+
+    @classmethod
+    def get(cls, url_list: List[str]):
+        with cls.lock:
+            for url in url_list:
+                key = cls.get_key(url)
+
+                if entry := cls.cache_dict.get(key):
+                    if entry.get("expires") > time.time():
+                        return url, entry
+
+                    del cls.cache_dict[key]
+
+    @classmethod
+    def set(cls, url: str, file_size: int, etag: str = None):
+        parsed_url = urlparse(url)
+
+        with cls.lock:
+            cls.cache_dict[cls.get_key(url)] = {
+                "file_size": file_size,
+                "host": parsed_url.netloc,
+                "etag": etag,
+                "expires": cls.get_expires(parsed_url.query)
+            }
+
+    @classmethod
+    def invalidate(cls, url: str):
+        with cls.lock:
+            cls.cache_dict.pop(cls.get_key(url), None)
+
+    @staticmethod
+    def get_key(url: str):
+        # 路径中包含 cid、清晰度和编码信息，不随节点和签名参数变化
+        return urlparse(url).path
+
+    @classmethod
+    def get_expires(cls, query: str):
+        expires = time.time() + cls.default_ttl
+
+        if deadline := parse_qs(query).get("deadline"):
+            try:
+                # 提前一分钟过期，避免使用即将失效的链接
+                return min(int(deadline[0]) - 60, expires)
+
+            except ValueError:
+                pass
+
+        return expires
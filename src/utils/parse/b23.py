@@ -12,7 +12,7 @@ class B23Parser(Parser):
         self.callback = callback
 
     def get_redirect_url(self, url: str):
-        req = RequestUtils.request_get(url, headers = RequestUtils.get_headers())
+        req = self.request_page(url, headers = RequestUtils.get_headers())
     
         return req.url
 
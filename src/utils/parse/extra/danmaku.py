@@ -1,20 +1,28 @@
 import math
-import json
+import time
+import requests
 from io import BytesIO
 from typing import List
-from google.protobuf import json_format
 
 from utils.auth.wbi import WbiUtils
 from utils.common.model.task_info import DownloadTaskInfo
 from utils.common.enums import DanmakuType
+from utils.common.async_request import AsyncRequestUtils
+from utils.common.rate_limit import RateLimiter
 
-import utils.module.danmaku.dm_pb2 as dm_pb2
+from utils.module.danmaku.reader import DanmakuReader
 
 from utils.parse.extra.parser import Parser
 from utils.parse.extra.file.danamku_xml import DanmakuXMLFile
+from utils.parse.extra.file.danmaku_json import DanmakuJSONFile
 from utils.parse.extra.file.danmaku_ass import DanmakuASSFile
 
 class DanmakuParser(Parser):
+    # 同时下载的弹幕分片数
+    max_segment_concurrency = 4
+    # 单个分片下载失败时的重试次数
+    segment_retry_count = 3
+
     def __init__(self, task_info: DownloadTaskInfo):
         Parser.__init__(self)
 
@@ -46,12 +54,9 @@ class DanmakuParser(Parser):
         self.task_info.total_file_size += self.total_file_size
 
     def generate_xml(self):
-        json_data = self.get_all_protobuf_json_data()
-
-        file = DanmakuXMLFile(json_data, self.task_info.cid)
-        contents = file.get_contents()
+        file = DanmakuXMLFile(DanmakuReader(self.buffers), self.task_info.cid)
 
-        self.save_file(f"{self.task_info.file_name}.xml", contents, "w")
+        self.save_file_stream(f"{self.task_info.file_name}.xml", file.write)
 
     def generate_protobuf(self):
         for index, buffer in enumerate(self.buffers):
@@ -60,52 +65,25 @@ class DanmakuParser(Parser):
             self.save_file(file_name, buffer.getvalue(), "wb")
 
     def generate_json(self):
-        json_data = self.get_all_protobuf_json_data()
-
-        contents = json.dumps({
-            "comments": json_data
-        }, ensure_ascii = False, indent = 4)
+        file = DanmakuJSONFile(DanmakuReader(self.buffers))
 
-        self.save_file(f"{self.task_info.file_name}.json", contents, "w")
+        self.save_file_stream(f"{self.task_info.file_name}.json", file.write)
 
     def generate_ass(self):
-        json_data = self.get_all_protobuf_json_data()
-
         resolution = self.get_video_resolution()
 
-        file = DanmakuASSFile(json_data, resolution)
-        contents = file.get_contents()
-
-        self.save_file(f"{self.task_info.file_name}.ass", contents, "w")
+        file = DanmakuASSFile(DanmakuReader(self.buffers), resolution)
 
-    def get_all_protobuf_buffers(self, task_info: DownloadTaskInfo):
-        buffers = []
+        self.save_file_stream(f"{self.task_info.file_name}.ass", file.write)
 
+    def get_all_protobuf_buffers(self, task_info: DownloadTaskInfo) -> List[BytesIO]:
         if task_info.duration:
+            # 每 6 分钟一个分片，各个分片同时下载，结果顺序与分片编号一致
             segments = math.ceil(task_info.duration / 360)
 
-            for index in range(1, segments + 1):
-                buffers.append(self.get_protobuf_data(task_info.cid, index))
-
-        return buffers
-
-    def get_all_protobuf_json_data(self):
-        json_data = []
-
-        seg = dm_pb2.DmSegMobileReply()
-
-        for buffer in self.buffers:
-            seg.ParseFromString(buffer.getvalue())
+            return AsyncRequestUtils.run(self.get_protobuf_data, [(task_info.cid, index) for index in range(1, segments + 1)], self.max_segment_concurrency)
 
-            segment = [json_format.MessageToDict(entry) for entry in seg.elems]
-
-            segment = [entry for entry in segment.copy() if entry.get("progress")]
-
-            json_data.extend(segment)
-
-        json_data.sort(key = lambda x: x.get("progress"))
-
-        return json_data
+        return []
 
     def get_protobuf_data(self, cid: int, index: int):
         params = {
@@ -116,9 +94,25 @@ class DanmakuParser(Parser):
 
         url = f"https://api.bilibili.com/x/v2/dm/wbi/web/seg.so?{WbiUtils.encWbi(params)}"
 
-        req = self.request_get(url)
+        # 每个分片单独重试，单个分片出错时不必重新下载全部分片
+        for retry in range(self.segment_retry_count + 1):
+            RateLimiter.acquire(url)
+
+            try:
+                req = self.request_get(url)
+
+                RateLimiter.feedback(url, 0)
+
+                return BytesIO(req.content)
+
+            except Exception as e:
+                if isinstance(e, requests.HTTPError) and e.response.status_code == 412:
+                    RateLimiter.feedback(url, -412)
+
+                if retry == self.segment_retry_count:
+                    raise
 
-        return BytesIO(req.content)
+                time.sleep(retry + 1)
     
     def get_protobuf_file_name(self, segments: int, index: int):
         if segments > 1:
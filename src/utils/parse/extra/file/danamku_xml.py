@@ -1,15 +1,18 @@
 import textwrap
-from typing import List
+from typing import Iterable, TextIO
 
 from utils.common.formatter.formatter import FormatUtils
 
+from utils.module.danmaku.reader import DanmakuRecord
+
 class DanmakuXMLFile:
-    def __init__(self, json_data: List[dict], cid: int):
-        self.json_data = json_data
+    def __init__(self, records: Iterable[DanmakuRecord], cid: int):
+        self.records = records
         self.cid = cid
 
-    def get_contents(self):
-        contents = textwrap.dedent("""\
+    def write(self, file: TextIO):
+        # 逐条写入弹幕，不在内存中拼接整个文件
+        file.write(textwrap.dedent("""\
             <?xml version="1.0" encoding="UTF-8"?>
             <i>
                 <chatserver>chat.bilibili.com</chatserver>
@@ -19,26 +22,21 @@ class DanmakuXMLFile:
                 <state>0</state>
                 <real_name>0</real_name>
                 <source>k-v</source>
-                {d_elements}
-            </i>
-            """.format(cid = self.cid, d_elements = self.get_d_elements()))
+            """.format(cid = self.cid)))
+
+        file.writelines(f"""    <d p="{self.get_p_attr(entry)}">{entry.content}</d>\n""" for entry in self.records)
 
-        return contents
-    
-    def get_d_elements(self):
-        p_elements = [f"""<d p="{self.get_p_attr(entry)}">{entry.get("content")}</d>""" for entry in self.json_data]
+        file.write("</i>\n")
 
-        return "\n                ".join(p_elements)
-    
-    def get_p_attr(self, entry: dict):
+    def get_p_attr(self, entry: DanmakuRecord):
         return ",".join([
-            FormatUtils.format_xml_timestamp(entry.get("progress") / 1000),
-            str(entry.get("mode")),
-            str(entry.get("fontsize")),
-            str(entry.get("color")),
-            str(entry.get("ctime")),
+            FormatUtils.format_xml_timestamp(entry.progress / 1000),
+            str(entry.mode),
+            str(entry.fontsize),
+            str(entry.color),
+            str(entry.ctime),
             "0",
-            str(entry.get("midHash")),
-            str(entry.get("id")),
-            str(entry.get("weight"))
+            entry.mid_hash,
+            str(entry.id),
+            str(entry.weight)
         ])
@@ -1,6 +1,7 @@
 import math
+import heapq
 
-from typing import List, Dict, Union
+from typing import Dict, Iterable, List, TextIO
 
 from utils.config import Config
 
@@ -8,6 +9,85 @@ from utils.common.model.data_type import CommentData
 from utils.common.style.color import Color
 from utils.common.formatter.formatter import FormatUtils
 
+from utils.module.danmaku.reader import DanmakuRecord
+
+class RowTrack:
+    # 同一类型弹幕的所有行，记录每行的弹幕和可以放置下一条弹幕的时间
+    # 弹幕按出现时间依次放置，到达释放时间的行移入空闲堆，查找最上方或最下方的空闲行只需对数时间
+    def __init__(self, row_count: int):
+        self.row_count = row_count
+
+        # 以行号为下标，空行的释放时间为 None
+        self.comment: List[CommentData] = [None] * (row_count + 1)
+        self.speed: List[int] = [0] * (row_count + 1)
+        self.release_time: List[float] = [None] * (row_count + 1)
+        self.version: List[int] = [0] * (row_count + 1)
+        self.free: List[bool] = [False] + [True] * row_count
+
+        # 空闲堆中可能残留已被占用的行，取出时跳过
+        self.free_heap: List[int] = list(range(1, row_count + 1))
+        self.reversed_free_heap: List[int] = list(range(-row_count, 0))
+        self.busy_heap: List[tuple] = []
+
+        self.current_time = -math.inf
+
+    def find_first_free_row(self, time: float):
+        if not self.advance(time):
+            return next((row for row in range(1, self.row_count + 1) if self.is_row_free(row, time)), None)
+
+        while self.free_heap and not self.free[self.free_heap[0]]:
+            heapq.heappop(self.free_heap)
+
+        return self.free_heap[0] if self.free_heap else None
+
+    def find_last_free_row(self, time: float):
+        if not self.advance(time):
+            return next((row for row in range(self.row_count, 0, -1) if self.is_row_free(row, time)), None)
+
+        while self.reversed_free_heap and not self.free[-self.reversed_free_heap[0]]:
+            heapq.heappop(self.reversed_free_heap)
+
+        return -self.reversed_free_heap[0] if self.reversed_free_heap else None
+
+    def advance(self, time: float):
+        # 时间倒退时返回 False，由调用方逐行查找
+        if time < self.current_time:
+            return False
+
+        self.current_time = time
+
+        while self.busy_heap and self.busy_heap[0][0] <= time:
+            (release_time, row, version) = heapq.heappop(self.busy_heap)
+
+            if version == self.version[row]:
+                self.set_free(row)
+
+        return True
+
+    def is_row_free(self, row: int, time: float):
+        return self.release_time[row] is None or time >= self.release_time[row]
+
+    def set_free(self, row: int):
+        self.free[row] = True
+
+        heapq.heappush(self.free_heap, row)
+        heapq.heappush(self.reversed_free_heap, -row)
+
+        # 残留的行过多时重建
+        if len(self.free_heap) > 2 * self.row_count or len(self.reversed_free_heap) > 2 * self.row_count:
+            self.free_heap = [row for row in range(1, self.row_count + 1) if self.free[row]]
+            self.reversed_free_heap = [-row for row in range(self.row_count, 0, -1) if self.free[row]]
+
+    def set_row(self, row: int, comment: CommentData, speed: int, release_time: float):
+        self.free[row] = False
+        self.version[row] += 1
+
+        self.comment[row] = comment
+        self.speed[row] = speed
+        self.release_time[row] = release_time
+
+        heapq.heappush(self.busy_heap, (release_time, row, self.version[row]))
+
 class Json2ASS:
     def __init__(self, video_width: int, video_height: int):
         self.video_width = video_width
@@ -25,6 +105,9 @@ class Json2ASS:
         self.stay_duration = 8 - danmaku_style.get("speed", 3) # value = 8 - speed
         self.density = 4 - 2 * danmaku_style.get("density", 1) # value = 4 - 2 * density
 
+        # 弹幕颜色种类很少，颜色样式只转换一次
+        self.color_style_cache: Dict[int, str] = {}
+
         self.init_data_table()
 
     def init_data_table(self):
@@ -37,15 +120,13 @@ class Json2ASS:
 
         row_count = math.floor(ratio * (self.video_height / self.font_size))
 
-        rows = {i + 1: None for i in range(row_count)}
-
-        self.data: Dict[int, Dict[int, Union[None, CommentData]]] = {i + 1: rows.copy() for i in range(3)}
-
-    def get_dialogue_list(self, data: list):
-        dialogue_list = []
+        # 底部弹幕只查找顶部弹幕占用的行，不单独记录
+        self.tracks: Dict[int, RowTrack] = {i + 1: RowTrack(row_count) for i in range(2)}
 
+    def get_dialogue_list(self, data: Iterable[DanmakuRecord]):
+        # 逐条返回，弹幕按出现时间依次处理
         for entry in data:
-            match entry["mode"]:
+            match entry.mode:
                 case 1 | 2 | 3:
                     # 普通弹幕
                     comment = self.process_comment(entry, 1, self.scroll_duration)
@@ -61,17 +142,14 @@ class Json2ASS:
                 case _:
                     comment = None
 
-            dialogue_list.append(comment)
-
-        dialogue_list = [entry for entry in dialogue_list.copy() if entry]
-
-        return dialogue_list
+            if comment:
+                yield comment
 
-    def process_comment(self, data: dict, type: int, duration: int):
-        start_time = data.get("progress") / 1000
+    def process_comment(self, data: DanmakuRecord, type: int, duration: int):
+        start_time = data.progress / 1000
         end_time = start_time + duration
-        content = data.get("content")
-        color = data.get("color")
+        content = data.content
+        color = data.color
 
         comment_data = self.check_row(type, self.get_comment_data(start_time, end_time, content))
 
@@ -96,8 +174,7 @@ class Json2ASS:
                     style = f"\\an2\\pos({left}, {top})"
 
             if color:
-                style += f"\\c{Color.convert_to_ass_bgr_color(Color.dec_to_hex(color))}"
-                style += f"\\alpha{Color.convert_to_ass_a_color(self.alpha)}"
+                style += self.get_color_style(color)
 
             return (
                 FormatUtils.format_ass_timestamp(start_time),
@@ -105,6 +182,12 @@ class Json2ASS:
                 f"{{{style}}}{content}"
             )
 
+    def get_color_style(self, color: int):
+        if color not in self.color_style_cache:
+            self.color_style_cache[color] = f"\\c{Color.convert_to_ass_bgr_color(Color.dec_to_hex(color))}\\alpha{Color.convert_to_ass_a_color(self.alpha)}"
+
+        return self.color_style_cache[color]
+
     def calc_pos(self, row: int):
         return int(self.video_width / 2), self.calc_row_height(row)
     
@@ -112,55 +195,61 @@ class Json2ASS:
         return (row - 1) * self.font_size
     
     def check_row(self, type: int, new_comment: CommentData):
-        def set_row(new_row: CommentData, row: int):
-            new_row.row = row
+        def check_normal_comment():
+            track = self.tracks.get(1)
 
-            self.data.get(type)[row] = new_row
+            if (row := track.find_first_free_row(new_comment.start_time)) is None:
+                return None
 
-            return new_row
+            if previous_comment := track.comment[row]:
+                previous_speed = track.speed[row]
+
+                duration = max((new_comment.width + self.video_width) / previous_speed, self.scroll_duration)
+                distance = math.ceil((new_comment.start_time - previous_comment.start_time) * previous_speed)
+
+                # 速度补偿
+                ratio = distance / self.video_width
+                offset = 0.3 - 0.2 * math.exp(-2.77 * ratio)
+
+                duration -= offset
+
+                new_comment.end_time = new_comment.start_time + duration
+
+            # 速度和释放时间在放置时计算一次，之后的弹幕直接比较
+            speed = math.ceil((new_comment.width + self.video_width) / (new_comment.end_time - new_comment.start_time))
+
+            if self.density == 3:
+                release_time = -math.inf
+            else:
+                release_time = (new_comment.start_time + new_comment.width / speed) + self.density
+
+            new_comment.row = row
+
+            track.set_row(row, new_comment, speed, release_time)
+
+            return new_comment
 
-        def check_normal_comment():
-            for row, previous_comment in self.data.get(type).items():
-                if previous_comment:
-                    previous_speed = math.ceil((previous_comment.width + self.video_width) / (previous_comment.end_time - previous_comment.start_time))
-
-                    if self.density == 3:
-                        previous_shown_time = new_comment.start_time
-                    else:
-                        previous_shown_time = (previous_comment.start_time + previous_comment.width / previous_speed) + self.density
-
-                    if new_comment.start_time >= previous_shown_time:
-                        duration = max((new_comment.width + self.video_width) / previous_speed, self.scroll_duration)
-                        distance = math.ceil((new_comment.start_time - previous_comment.start_time) * previous_speed)
-                        
-                        # 速度补偿
-                        ratio = distance / self.video_width
-                        offset = 0.3 - 0.2 * math.exp(-2.77 * ratio)
-
-                        duration -= offset
-
-                        new_comment.end_time = new_comment.start_time + duration
-
-                        return set_row(new_comment, row)
-                else:
-                    return set_row(new_comment, row)
-        
         def check_top_comment():
-            for row, previous_comment in self.data.get(type).items():
-                if previous_comment:
-                    if new_comment.start_time >= (previous_comment.end_time + self.density):
-                        return set_row(new_comment, row)
-                else:
-                    return set_row(new_comment, row)
-        
+            track = self.tracks.get(2)
+
+            if (row := track.find_first_free_row(new_comment.start_time)) is None:
+                return None
+
+            new_comment.row = row
+
+            track.set_row(row, new_comment, 0, new_comment.end_time + self.density)
+
+            return new_comment
+
         def check_bottom_comment():
-            for row, previous_comment in reversed(list(self.data.get(2).items())):
-                if previous_comment:
-                    if new_comment.start_time >= (previous_comment.end_time + self.density):
-                        return set_row(new_comment, row)
-                else:
-                    return set_row(new_comment, row)
-    
+            # 从下往上查找顶部弹幕未占用的行
+            if (row := self.tracks.get(2).find_last_free_row(new_comment.start_time)) is None:
+                return None
+
+            new_comment.row = row
+
+            return new_comment
+
         match type:
             case 1:
                 return check_normal_comment()
@@ -184,15 +273,16 @@ class Json2ASS:
         return data
     
 class DanmakuASSFile:
-    def __init__(self, json_data: List[dict], resolution: dict):
-        self.json_data = json_data
+    def __init__(self, records: Iterable[DanmakuRecord], resolution: dict):
+        self.records = records
         self.video_width = resolution.get("width")
         self.video_height = resolution.get("height")
 
-    def get_contents(self):
-        sections = (self.get_script_info_section(), self.get_styles_section(), self.get_events_section())
+    def write(self, file: TextIO):
+        # 字幕条目逐条写入，不在内存中拼接整个文件
+        file.write("\n\n".join((self.get_script_info_section(), self.get_styles_section(), self.get_events_section())))
 
-        return "\n\n".join(sections)
+        file.writelines(f"\nDialogue: 2,{start_time},{end_time},Default,,0,0,0,,{content}" for (start_time, end_time, content) in Json2ASS(self.video_width, self.video_height).get_dialogue_list(self.records))
 
     def get_script_info_section(self):
         data = [
@@ -218,18 +308,10 @@ class DanmakuASSFile:
         return self.format_section("V4+ Styles", data)
     
     def get_events_section(self):
+        # 仅包含格式行，字幕条目由 write 逐条写入
         data = [
             ("Format", "Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"),
         ]
-        
-        converter = Json2ASS(self.video_width, self.video_height)
-
-        dialogues = [
-            ("Dialogue", f"2,{start_time},{end_time},Default,,0,0,0,,{content}")
-            for (start_time, end_time, content) in converter.get_dialogue_list(self.json_data)
-        ]
-
-        data.extend(dialogues)
 
         return self.format_section("Events", data)
 
@@ -0,0 +1,28 @@
+import json
+from typing import Iterable, TextIO
+
+from utils.module.danmaku.reader import DanmakuRecord
+
+class DanmakuJSONFile:
+    def __init__(self, records: Iterable[DanmakuRecord]):
+        self.records = records
+
+    def write(self, file: TextIO):
+        # 逐条写入弹幕，格式与 json.dumps({"comments": [...]}, indent = 4) 相同
+        file.write('{\n    "comments": [')
+
+        separator = "\n"
+
+        for entry in self.records:
+            file.write(separator + self.format_entry(entry))
+
+            separator = ",\n"
+
+        # 没有弹幕时输出空列表
+        file.write("\n    ]\n}" if separator != "\n" else "]\n}")
+
+    def format_entry(self, entry: DanmakuRecord):
+        contents = json.dumps(entry.to_json_dict(), ensure_ascii = False, indent = 4)
+
+        # 字符串中的换行已被转义，直接按行缩进到列表元素的层级
+        return "        " + contents.replace("\n", "\n        ")
@@ -1,31 +1,23 @@
+from typing import TextIO
+
 from utils.common.formatter.formatter import FormatUtils
 
 from utils.config import Config
 
-class Json2ASS:
-    @staticmethod
-    def get_dialogue_list(json_data: dict):
-        dialogue_list = []
-
-        for entry in json_data["body"]:
-            dialogue_list.append((
-                FormatUtils.format_ass_timestamp(entry["from"]),
-                FormatUtils.format_ass_timestamp(entry["to"]),
-                entry["content"]
-            ))
+from utils.parse.extra.file.subtitle_writer import SubtitleFile
 
-        return dialogue_list
+class SubtitleASSFile(SubtitleFile):
+    extension = "ass"
 
-class SubtitleASSFile:
-    def __init__(self, json_data: dict, resolution: dict):
-        self.json_data = json_data
+    def __init__(self, resolution: dict):
         self.video_width = resolution.get("width")
         self.video_height = resolution.get("height")
 
-    def get_contents(self):
-        sections = (self.get_script_info_section(), self.get_styles_section(), self.get_events_section())
+    def write_header(self, file: TextIO, json_data: dict):
+        file.write("\n\n".join((self.get_script_info_section(), self.get_styles_section(), self.get_events_section())))
 
-        return "\n\n".join(sections)
+    def write_entry(self, file: TextIO, index: int, entry: dict):
+        file.write(f"\nDialogue: 2,{FormatUtils.format_ass_timestamp(entry['from'])},{FormatUtils.format_ass_timestamp(entry['to'])},Default,,0,0,0,,{entry['content']}")
     
     def get_script_info_section(self):
         data = [
@@ -51,18 +43,10 @@ class SubtitleASSFile:
         return self.format_section("V4+ Styles", data)
     
     def get_events_section(self):
+        # 仅包含格式行，字幕条目由 write_entry 逐条写入
         data = [
             ("Format", "Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"),
         ]
-        
-        converter = Json2ASS()
-
-        dialogues = [
-            ("Dialogue", f"2,{start_time},{end_time},Default,,0,0,0,,{content}")
-            for (start_time, end_time, content) in converter.get_dialogue_list(self.json_data)
-        ]
-
-        data.extend(dialogues)
 
         return self.format_section("Events", data)
     
@@ -0,0 +1,31 @@
+import json
+from typing import TextIO
+
+from utils.common.formatter.formatter import FormatUtils
+
+from utils.parse.extra.file.subtitle_writer import SubtitleFile
+
+class SubtitleSRTFile(SubtitleFile):
+    extension = "srt"
+
+    def write_entry(self, file: TextIO, index: int, entry: dict):
+        file.write(f"{index + 1}\n{FormatUtils.format_srt_line(entry['from'], entry['to'])}\n{entry['content']}\n\n")
+
+class SubtitleTXTFile(SubtitleFile):
+    extension = "txt"
+
+    def write_entry(self, file: TextIO, index: int, entry: dict):
+        file.write(f"{entry['content']}\n")
+
+class SubtitleLRCFile(SubtitleFile):
+    extension = "lrc"
+
+    def write_entry(self, file: TextIO, index: int, entry: dict):
+        file.write(f"[{FormatUtils.format_lrc_line(entry['from'])}]{entry['content']}\n")
+
+class SubtitleJSONFile(SubtitleFile):
+    extension = "json"
+
+    def write_header(self, file: TextIO, json_data: dict):
+        # 保存原始数据，json.dump 分段写入文件
+        json.dump(json_data, file, ensure_ascii = False, indent = 4)
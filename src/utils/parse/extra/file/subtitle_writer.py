@@ -0,0 +1,35 @@
+import os
+from contextlib import ExitStack
+from typing import List, TextIO, Tuple
+
+class SubtitleFile:
+    # 字幕文件格式，逐条写入字幕，不在内存中拼接整个文件
+    extension = ""
+
+    def write_header(self, file: TextIO, json_data: dict):
+        pass
+
+    def write_entry(self, file: TextIO, index: int, entry: dict):
+        pass
+
+    def write_footer(self, file: TextIO):
+        pass
+
+class SubtitleWriter:
+    @staticmethod
+    def write(json_data: dict, file_list: List[Tuple[str, SubtitleFile]]):
+        # 遍历一次字幕，同时写入多个格式的文件，返回写入的文件总大小
+        with ExitStack() as stack:
+            target_list = [(stack.enter_context(open(file_path, "w", encoding = "utf-8")), subtitle_file) for (file_path, subtitle_file) in file_list]
+
+            for (file, subtitle_file) in target_list:
+                subtitle_file.write_header(file, json_data)
+
+            for index, entry in enumerate(json_data["body"]):
+                for (file, subtitle_file) in target_list:
+                    subtitle_file.write_entry(file, index, entry)
+
+            for (file, subtitle_file) in target_list:
+                subtitle_file.write_footer(file)
+
+        return sum(os.stat(file_path).st_size for (file_path, subtitle_file) in file_list)
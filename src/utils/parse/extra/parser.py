@@ -1,8 +1,10 @@
 import os
 import json
+from typing import Callable, TextIO
 
 from utils.config import Config
 from utils.common.request import RequestUtils
+from utils.common.rate_limit import RateLimiter
 from utils.common.model.task_info import DownloadTaskInfo
 from utils.common.enums import StatusCode
 from utils.common.exception import GlobalException
@@ -13,17 +15,27 @@ class Parser:
         self.task_info: DownloadTaskInfo = None
     
     def request_get(self, url: str, check: bool = False):
+        # 与解析请求共用限流器，字幕等多个文件同时获取时同样受限
+        RateLimiter.acquire(url)
+
         req = RequestUtils.request_get(url, headers = RequestUtils.get_headers(referer_url = "https://www.bilibili.com/", sessdata = Config.User.SESSDATA))
 
+        if req.status_code == 412:
+            RateLimiter.feedback(url, -412)
+
         req.raise_for_status()
 
         if check:
             data = json.loads(req.text)
 
+            RateLimiter.feedback(url, data.get("code"))
+
             self.check_json(data)
 
             return data
 
+        RateLimiter.feedback(url, 0)
+
         return req
     
     def save_file(self, file_name: str, contents: str, mode: str):
@@ -36,6 +48,15 @@ class Parser:
 
         self.total_file_size += os.stat(file_path).st_size
 
+    def save_file_stream(self, file_name: str, write: Callable[[TextIO], None]):
+        # 内容由 write 边生成边写入，不必在内存中保存整个文件
+        file_path = os.path.join(self.task_info.download_path, file_name)
+
+        with open(file_path, "w", encoding = "utf-8") as file:
+            write(file)
+
+        self.total_file_size += os.stat(file_path).st_size
+
     def save_file_ex(self, path: str, file_name: str, contents: str, mode: str):
         file_path = os.path.join(path, file_name)
 
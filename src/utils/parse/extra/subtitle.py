@@ -1,4 +1,4 @@
-import json
+import os
 from typing import List
 
 from utils.config import Config
@@ -6,9 +6,11 @@ from utils.auth.wbi import WbiUtils
 
 from utils.common.model.task_info import DownloadTaskInfo
 from utils.common.enums import SubtitleLanOption, SubtitleType
-from utils.common.formatter.formatter import FormatUtils
+from utils.common.async_request import AsyncRequestUtils
 
 from utils.parse.extra.parser import Parser
+from utils.parse.extra.file.subtitle_writer import SubtitleFile, SubtitleWriter
+from utils.parse.extra.file.subtitle_text import SubtitleSRTFile, SubtitleTXTFile, SubtitleLRCFile, SubtitleJSONFile
 from utils.parse.extra.file.subtitle_ass import SubtitleASSFile
 
 class SubtitleParser(Parser):
@@ -18,90 +20,61 @@ class SubtitleParser(Parser):
         self.task_info = task_info
 
     def parse(self):
-        url_list: List[dict] = self.get_all_subtitle_urls()
+        entry_list = [entry for entry in self.get_all_subtitle_urls() if self.check_language(entry.get("lan"))]
 
-        for entry in url_list:
-            language = entry.get("lan")
+        # 所选语言的字幕同时获取，结果顺序与字幕列表一致
+        json_data_list = AsyncRequestUtils.run(self.get_subtitle_json, [(entry, ) for entry in entry_list])
 
-            if SubtitleLanOption(Config.Basic.subtitle_lan_option) == SubtitleLanOption.Custom:
-                if language not in Config.Basic.subtitle_lan_custom_type:
-                    continue
+        subtitle_file_list = self.get_subtitle_file_list()
 
-            url = "https:" + entry.get("subtitle_url")
-
-            json_data = self.request_get(url, check = True)
-
-            self.generate_subtitle(json_data, language)
+        for entry, json_data in zip(entry_list, json_data_list):
+            self.generate_subtitle(json_data, entry.get("lan"), subtitle_file_list)
 
         self.task_info.total_file_size += self.total_file_size
 
-    def generate_subtitle(self, json_data: dict, language: str):
-        match SubtitleType(self.task_info.extra_option.get("subtitle_file_type")):
-            case SubtitleType.SRT:
-                self.task_info.output_type = "srt"
-                self.generate_srt(json_data, language)
-
-            case SubtitleType.TXT:
-                self.task_info.output_type = "txt"
-                self.generate_txt(json_data, language)
-
-            case SubtitleType.LRC:
-                self.task_info.output_type = "lrc"
-                self.generate_lrc(json_data, language)
-
-            case SubtitleType.JSON:
-                self.task_info.output_type = "json"
-                self.generate_json(json_data, language)
-
-            case SubtitleType.ASS:
-                self.task_info.output_type = "ass"
-                self.generate_ass(json_data, language)
-
-    def generate_srt(self, json_data: dict, language: str):
-        contents = ""
-
-        for index, entry in enumerate(json_data["body"]):
-            id = index + 1
-            timestamp = FormatUtils.format_srt_line(entry["from"], entry["to"])
-            content = entry["content"]
-
-            contents += f"{id}\n{timestamp}\n{content}\n\n"
-
-        self.save_file(f"{self.task_info.file_name}_{language}.srt", contents, "w")
+    def check_language(self, language: str):
+        if SubtitleLanOption(Config.Basic.subtitle_lan_option) == SubtitleLanOption.Custom:
+            return language in Config.Basic.subtitle_lan_custom_type
 
-    def generate_txt(self, json_data: dict, language: str):
-        contents = ""
+        return True
 
-        for entry in json_data["body"]:
-            content = entry["content"]
+    def get_subtitle_json(self, entry: dict):
+        url = "https:" + entry.get("subtitle_url")
 
-            contents += f"{content}\n"
+        return self.request_get(url, check = True)
 
-        self.save_file(f"{self.task_info.file_name}_{language}.txt", contents, "w")
+    def generate_subtitle(self, json_data: dict, language: str, subtitle_file_list: List[SubtitleFile]):
+        # 同一种语言的多个格式在一次遍历中写入
+        file_list = [(os.path.join(self.task_info.download_path, f"{self.task_info.file_name}_{language}.{subtitle_file.extension}"), subtitle_file) for subtitle_file in subtitle_file_list]
 
-    def generate_lrc(self, json_data: dict, language: str):
-        contents = ""
+        self.total_file_size += SubtitleWriter.write(json_data, file_list)
 
-        for entry in json_data["body"]:
-            timestamp = FormatUtils.format_lrc_line(entry["from"])
-            content = entry["content"]
+        # 只在写入了字幕文件时记录输出格式
+        self.task_info.output_type = subtitle_file_list[0].extension
 
-            contents += f"[{timestamp}]{content}\n"
+    def get_subtitle_file_list(self):
+        # 字幕格式可以为单个或多个
+        subtitle_file_type = self.task_info.extra_option.get("subtitle_file_type")
+        subtitle_file_type_list = subtitle_file_type if isinstance(subtitle_file_type, list) else [subtitle_file_type]
 
-        self.save_file(f"{self.task_info.file_name}_{language}.lrc", contents, "w")
+        return [self.get_subtitle_file(SubtitleType(file_type)) for file_type in subtitle_file_type_list]
 
-    def generate_json(self, json_data: dict, language: str):
-        contents = json.dumps(json_data, ensure_ascii = False, indent = 4)
+    def get_subtitle_file(self, subtitle_type: SubtitleType) -> SubtitleFile:
+        match subtitle_type:
+            case SubtitleType.SRT:
+                return SubtitleSRTFile()
 
-        self.save_file(f"{self.task_info.file_name}_{language}.json", contents, "w")
+            case SubtitleType.TXT:
+                return SubtitleTXTFile()
 
-    def generate_ass(self, json_data: dict, language: str):
-        resolution = self.get_video_resolution()
+            case SubtitleType.LRC:
+                return SubtitleLRCFile()
 
-        file = SubtitleASSFile(json_data, resolution)
-        contents = file.get_contents()
+            case SubtitleType.JSON:
+                return SubtitleJSONFile()
 
-        self.save_file(f"{self.task_info.file_name}_{language}.ass", contents, "w")
+            case SubtitleType.ASS:
+                return SubtitleASSFile(self.get_video_resolution())
 
     def get_all_subtitle_urls(self):
         params = {
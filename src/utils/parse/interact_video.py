@@ -1,5 +1,4 @@
 import json
-import time
 from typing import List
 
 from utils.config import Config
@@ -117,10 +116,7 @@ class InteractVideoParser(Parser):
 
         url = f"https://api.bilibili.com/x/player/wbi/v2?{WbiUtils.encWbi(params)}"
 
-        req = RequestUtils.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
-        resp = json.loads(req.text)
-
-        self.check_json(resp)
+        resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
 
         info = self.json_get(resp, "data")
 
@@ -136,10 +132,7 @@ class InteractVideoParser(Parser):
         }
         url = f"https://api.bilibili.com/x/stein/edgeinfo_v2?{self.url_encode(params)}"
 
-        req = RequestUtils.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
-        resp = json.loads(req.text)
-
-        self.check_json(resp)
+        resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
 
         info = self.json_get(resp, "data")
 
@@ -157,7 +150,5 @@ class InteractVideoParser(Parser):
         
         while option:
             option = self.get_video_interactive_edge_info(option.target_node_cid, option.edge_id)
-            
-            time.sleep(0.1)
 
         return InteractVideoInfo.node_list
@@ -1,11 +1,13 @@
 import re
 import wx
 import json
+import requests
 import urllib.parse
 
 from utils.common.enums import StatusCode, ProcessingType
 from utils.common.exception import GlobalException
 from utils.common.request import RequestUtils
+from utils.common.rate_limit import RateLimiter
 from utils.common.thread import Thread
 
 class Parser:
@@ -25,11 +27,11 @@ class Parser:
 
     @classmethod
     def request_get(cls, url: str, headers: dict, check: bool = True) -> dict:
+        RateLimiter.acquire(url)
+
         req = RequestUtils.request_get(url, headers)
 
-        req.raise_for_status()
-
-        resp = json.loads(req.text)
+        resp = cls.check_response(url, req)
 
         if check:
             cls.check_json(resp)
@@ -38,14 +40,39 @@ class Parser:
 
         return resp
     
+    @staticmethod
+    def request_page(url: str, headers: dict) -> requests.Response:
+        # 请求网页等非 JSON 内容，同样经过限流器
+        RateLimiter.acquire(url)
+
+        req = RequestUtils.request_get(url, headers)
+
+        RateLimiter.feedback(url, -412 if req.status_code == 412 else 0)
+
+        return req
+
     def request_post(self, url: str, headers: dict, raw_json: dict):
+        RateLimiter.acquire(url)
+
         req = RequestUtils.request_post(url, headers, json = raw_json)
 
+        resp = self.check_response(url, req)
+
+        self.check_json(resp)
+
+        return resp
+
+    @staticmethod
+    def check_response(url: str, req: requests.Response):
+        # 将响应结果反馈给限流器，HTTP 412 同样视为触发风控
+        if req.status_code == 412:
+            RateLimiter.feedback(url, -412)
+
         req.raise_for_status()
 
         resp = json.loads(req.text)
 
-        self.check_json(resp)
+        RateLimiter.feedback(url, resp.get("code"))
 
         return resp
 
@@ -1,11 +1,12 @@
 import math
-import time
+import itertools
 
 from utils.config import Config
 from utils.auth.wbi import WbiUtils
 
 from utils.common.enums import StatusCode, ProcessingType, TemplateType, ParseType
 from utils.common.request import RequestUtils
+from utils.common.async_request import AsyncRequestUtils
 from utils.common.model.callback import ParseCallback
 from utils.common.formatter.file_name_v2 import FileNameFormatter
 from utils.common.regex import Regex
@@ -44,8 +45,9 @@ class FavListParser(Parser):
 
         resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
 
-        data = self.json_get(resp, "data")
-        
+        return self.json_get(resp, "data")
+
+    def add_favlist_info(self, data: dict):
         info = data["info"]
         medias = data["medias"]
 
@@ -68,8 +70,6 @@ class FavListParser(Parser):
 
         resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA), check = False)
 
-        self.total_data += 1
-
         if data := resp.get("data"):
             data["parse_type"] = ParseType.Video.value
 
@@ -83,8 +83,6 @@ class FavListParser(Parser):
         url = f"https://api.bilibili.com/pgc/view/web/season?{self.url_encode(params)}"
 
         resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA), check = False)
-        
-        self.total_data += 1
 
         if data := resp.get("result"):
             data["parse_type"] = ParseType.Bangumi.value
@@ -92,43 +90,52 @@ class FavListParser(Parser):
             return data
 
     def parse_favlist_info(self, media_id: int):
-        total = self.get_favlist_info(media_id)
+        def worker(pn: int):
+            data = self.get_favlist_info(media_id, pn)
+
+            self.onUpdateTitle(next(counter), total_page, self.total_data)
+
+            return data
+
+        total = self.add_favlist_info(self.get_favlist_info(media_id))
         total_page = self.get_total_page(total)
 
         self.onUpdateName(self.fav_title)
         self.onUpdateTitle(1, total_page, self.total_data)
 
-        for i in range(1, total_page):
-            page = i + 1
+        # 页码计数器，next() 是原子操作，可在多个线程中安全调用
+        counter = itertools.count(2)
 
-            self.get_favlist_info(media_id, page)
-
-            self.onUpdateTitle(page, total_page, self.total_data)
+        # 第一页获取到总数后，剩余页面同时获取，再按页码顺序合并
+        for data in AsyncRequestUtils.run(worker, [(pn, ) for pn in range(2, total_page + 1)]):
+            self.add_favlist_info(data)
 
     def parse_video_info(self, video_info_to_parse: list[dict], detail_mode_callback):
-        video_info_list = []
-
-        time.sleep(0.5)
-
-        self.change_processing_type(ProcessingType.Page)
-
-        for entry in video_info_to_parse:
-            self.onUpdateName(entry["title"])
-            self.onUpdateTitle(1, 1, self.total_data)
-
+        def worker(entry: dict):
             bvid = entry.get("bvid")
 
             match ParseType(entry["type"]):
                 case ParseType.Video:
-                    video_info_list.append(self.get_video_info(bvid))
+                    info = self.get_video_info(bvid)
 
                 case ParseType.Bangumi:
                     info = self.get_bangumi_info(entry["season_id"])
                     info["target_bvid"] = bvid
 
-                    video_info_list.append(info)
+            self.onUpdateName(entry["title"])
+            self.onUpdateTitle(1, 1, next(counter))
+
+            return info
+
+        self.change_processing_type(ProcessingType.Page)
+
+        # 完成计数器，next() 是原子操作，可在多个线程中安全调用
+        counter = itertools.count(self.total_data + 1)
+
+        # 各个视频的信息互不依赖，同时获取，结果顺序与列表一致
+        video_info_list = AsyncRequestUtils.run(worker, [(entry, ) for entry in video_info_to_parse])
 
-        time.sleep(0.5)
+        self.total_data += len(video_info_to_parse)
 
         self.change_processing_type(ProcessingType.Process)
 
@@ -141,8 +148,6 @@ class FavListParser(Parser):
 
         media_id = self.get_media_id(url)
 
-        time.sleep(0.5)
-
         self.change_processing_type(ProcessingType.Page)
 
         self.parse_favlist_info(media_id)
@@ -169,8 +174,6 @@ class FavListParser(Parser):
     def onUpdateTitle(self, page: int, total_page: int, total_data: int):
         self.callback.onUpdateTitle(f"当前第 {page} 页，共 {total_page} 页，已解析 {total_data} 条数据")
 
-        time.sleep(0.1)
-
     def get_total_page(self, total: int):
         return math.ceil(total / 40)
     
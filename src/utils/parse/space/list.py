@@ -1,11 +1,13 @@
 import math
-import time
-from typing import Dict
+import itertools
+from typing import Dict, Callable
+from typing import List as ListType
 
 from utils.auth.wbi import WbiUtils
 from utils.config import Config
 
 from utils.common.request import RequestUtils
+from utils.common.async_request import AsyncRequestUtils
 from utils.common.model.callback import ParseCallback
 from utils.common.enums import StatusCode, ProcessingType
 from utils.common.exception import GlobalException
@@ -75,8 +77,9 @@ class SpaceListParser(Parser):
 
         resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
 
-        data = self.json_get(resp, "data")
+        return self.json_get(resp, "data")
 
+    def add_season_info(self, data: dict):
         section_title = data["meta"]["name"]
         episodes = data["archives"]
 
@@ -104,7 +107,7 @@ class SpaceListParser(Parser):
 
         return section_title, data["meta"]["total"]
 
-    def get_series_archives_info(self, mid: int, series_id: int, section_title: str, pn: int = 1):
+    def get_series_archives_info(self, mid: int, series_id: int, pn: int = 1):
         params = {
             "mid": mid,
             "series_id": series_id,
@@ -116,8 +119,9 @@ class SpaceListParser(Parser):
 
         resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
 
-        data = self.json_get(resp, "data")
+        return self.json_get(resp, "data")
 
+    def add_series_archives_info(self, section_title: str, data: dict):
         archives = data["archives"]
 
         Section.update_section(section_title, archives)
@@ -135,8 +139,9 @@ class SpaceListParser(Parser):
 
         resp = self.request_get(url, headers = RequestUtils.get_headers(referer_url = self.bilibili_url, sessdata = Config.User.SESSDATA))
 
-        data = self.json_get(resp, "data")
+        return self.json_get(resp, "data")
 
+    def add_season_series_info(self, data: dict):
         items_list = data["items_lists"]
 
         Section.seasons_list.extend([entry["meta"]["season_id"] for entry in items_list.get("seasons_list")])
@@ -167,8 +172,6 @@ class SpaceListParser(Parser):
 
         mid = self.get_mid(url)
 
-        time.sleep(0.5)
-
         self.change_processing_type(ProcessingType.Page)
 
         bvid, cid = None, None
@@ -206,18 +209,15 @@ class SpaceListParser(Parser):
         return StatusCode.Success.value
 
     def parse_season_info(self, mid: str, season_id: int):
-        section_title, total = self.get_season_info(mid, season_id)
+        section_title, total = self.add_season_info(self.get_season_info(mid, season_id))
         total_page = self.get_total_page(total)
 
         self.onUpdateName(section_title)
         self.onUpdateTitle(1, total_page, Section.total_entries)
 
-        for i in range(1, total_page):
-            page = i + 1
-
-            self.get_season_info(mid, season_id, page)
-
-            self.onUpdateTitle(page, total_page, Section.total_entries)
+        # 第一页获取到总数后，剩余页面同时获取，再按页码顺序合并
+        for data in self.request_pages(self.get_season_info, [(mid, season_id, page) for page in range(2, total_page + 1)], total_page, lambda: Section.total_entries):
+            self.add_season_info(data)
 
     def parse_series_info(self, mid: int, series_id: int):
         section_title, total = self.get_series_meta_info(series_id)
@@ -226,37 +226,25 @@ class SpaceListParser(Parser):
         self.onUpdateName(section_title)
         self.onUpdateTitle(1, total_page, Section.total_entries)
 
-        for i in range(total_page):
-            page = i + 1
-
-            self.get_series_archives_info(mid, series_id, section_title, page)
-
-            self.onUpdateTitle(page, total_page, Section.total_entries)
+        for data in self.request_pages(self.get_series_archives_info, [(mid, series_id, page) for page in range(1, total_page + 1)], total_page, lambda: Section.total_entries, start_page = 0):
+            self.add_series_archives_info(section_title, data)
 
     def parse_season_series_info(self, mid: int):
-        total = self.get_season_series_info(mid)
+        total = self.add_season_series_info(self.get_season_series_info(mid))
         total_page = self.get_total_page(total)
 
         self.onUpdateName("合集列表")
         self.onUpdateTitle(1, total_page, Section.get_total_data())
 
-        for i in range(1, total_page):
-            page = i + 1
-
-            self.get_season_series_info(mid, page)
-
-            self.onUpdateTitle(page, total_page, Section.get_total_data())
+        for data in self.request_pages(self.get_season_series_info, [(mid, page) for page in range(2, total_page + 1)], total_page, Section.get_total_data):
+            self.add_season_series_info(data)
 
         for season_id in Section.seasons_list:
             self.parse_season_info(mid, season_id)
 
-            time.sleep(1)
-
         for series_id in Section.series_list:
             self.parse_series_info(mid, series_id)
 
-            time.sleep(1)
-
     def parse_episodes(self):
         List.parse_episodes(Section.info_json, self.bvid)
 
@@ -276,7 +264,18 @@ class SpaceListParser(Parser):
     def onUpdateTitle(self, page: int, total_page: int, total_data: int):
         self.callback.onUpdateTitle(f"当前第 {page} 页，共 {total_page} 页，已解析 {total_data} 条数据")
 
-        time.sleep(0.3)
+    def request_pages(self, func: Callable, args_list: ListType[tuple], total_page: int, get_total_data: Callable, start_page: int = 1):
+        # 页码计数器，next() 是原子操作，可在多个线程中安全调用
+        counter = itertools.count(start_page + 1)
+
+        def worker(*args):
+            data = func(*args)
+
+            self.onUpdateTitle(next(counter), total_page, get_total_data())
+
+            return data
+
+        return AsyncRequestUtils.run(worker, args_list)
 
     def get_total_page(self, total: int):
         return math.ceil(total / 30)
@@ -1,10 +1,12 @@
 import math
-import time
+import itertools
+from typing import Callable
 
 from utils.config import Config
 from utils.auth.wbi import WbiUtils
 
 from utils.common.request import RequestUtils
+from utils.common.async_request import AsyncRequestUtils
 from utils.common.enums import StatusCode, ProcessingType, TemplateType, ParseType
 from utils.common.model.callback import ParseCallback
 from utils.common.formatter.file_name_v2 import FileNameFormatter
@@ -68,8 +70,6 @@ class SpaceParser(Parser):
 
         info_json: dict = self.json_get(resp, "data")
 
-        self.total_data += 1
-
         info_json["is_avoided"] = is_avoided
 
         return info_json
@@ -85,8 +85,6 @@ class SpaceParser(Parser):
 
         data: dict = self.json_get(resp, "data")
 
-        self.total_data += 1
-
         return data
 
     def get_uname_by_mid(self, mid: int):
@@ -122,12 +120,18 @@ class SpaceParser(Parser):
 
             if result != "error":
                 self.onUpdateTitle(page, total_page, self.total_data)
-                
-                time.sleep(self.get_sleep_time())
             else:
                 break
     
     def parse_video_info(self, video_info_to_parse: list[dict], detail_mode_callback):
+        def worker(entry: dict, func: Callable, args: tuple):
+            info = func(*args)
+
+            self.onUpdateName(entry["title"])
+            self.onUpdateTitle(1, 1, next(counter))
+
+            return info
+
         video_info_list = {
             "sequence": [],
             "video_season_dict": {},
@@ -135,14 +139,11 @@ class SpaceParser(Parser):
             "cheese_season_dict": {}
         }
 
-        time.sleep(0.5)
-
         self.change_processing_type(ProcessingType.Page)
 
-        for entry in video_info_to_parse:
-            self.onUpdateName(entry["title"])
-            self.onUpdateTitle(1, 1, self.total_data)
+        request_list = []
 
+        for entry in video_info_to_parse:
             season_id = entry.get("season_id")
             bvid = entry.get("bvid")
 
@@ -162,15 +163,26 @@ class SpaceParser(Parser):
                             # already exists, pass
                             continue
 
-                        video_info_list["video_season_dict"][season_id] = self.get_video_info(bvid, is_avoided)
+                        video_info_list["video_season_dict"][season_id] = None
+
+                        request_list.append((entry, "video_season_dict", season_id, self.get_video_info, (bvid, is_avoided)))
 
                     else:
-                        video_info_list["video_bvid_dict"][bvid] = self.get_video_info(bvid, is_avoided)
+                        request_list.append((entry, "video_bvid_dict", bvid, self.get_video_info, (bvid, is_avoided)))
 
                 case ParseType.Cheese:
-                    video_info_list["cheese_season_dict"][season_id] = self.get_cheese_info(season_id)
+                    request_list.append((entry, "cheese_season_dict", season_id, self.get_cheese_info, (season_id, )))
+
+        # 完成计数器，next() 是原子操作，可在多个线程中安全调用
+        counter = itertools.count(self.total_data + 1)
+
+        # 各个视频的信息互不依赖，同时获取
+        info_list = AsyncRequestUtils.run(worker, [(entry, func, args) for (entry, category, key, func, args) in request_list])
 
-        time.sleep(0.5)
+        self.total_data += len(request_list)
+
+        for (entry, category, key, func, args), info in zip(request_list, info_list):
+            video_info_list[category][key] = info
 
         self.change_processing_type(ProcessingType.Process)
 
@@ -185,8 +197,6 @@ class SpaceParser(Parser):
 
         self.mid = self.get_mid(url)
 
-        time.sleep(0.5)
-
         self.change_processing_type(ProcessingType.Page)
 
         self.parse_space_info(self.mid)
@@ -230,17 +240,3 @@ class SpaceParser(Parser):
         }
 
         return template.format(**field_dict)
-    
-    def get_sleep_time(self):
-        if self.total_data < 30:
-            return 0.1
-        
-        elif self.total_data < 50:
-            return 0.2
-        
-        elif self.total_data < 100:
-            return 0.5
-        
-        else:
-            return 1.0
-        
\ No newline at end of file
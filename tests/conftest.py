@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# 导入 utils 时会在当前目录下创建配置文件，测试在临时目录中进行
+os.chdir(tempfile.mkdtemp())
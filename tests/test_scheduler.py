@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from utils.config import Config
+from utils.module.scheduler import DownloadScheduler
+
+@pytest.fixture(autouse = True)
+def reset_scheduler(monkeypatch):
+    monkeypatch.setattr(Config.Download, "max_download_count", 2)
+    monkeypatch.setattr(Config.Download, "max_connection_per_host", 2)
+
+    DownloadScheduler.waiting_dict.clear()
+    DownloadScheduler.running_set.clear()
+    DownloadScheduler.host_connection_dict.clear()
+
+    yield
+
+    DownloadScheduler.waiting_dict.clear()
+    DownloadScheduler.running_set.clear()
+    DownloadScheduler.host_connection_dict.clear()
+
+def submit(started: list, id: int, priority: int = 0, order: int = 0):
+    DownloadScheduler.submit(id, priority, order, lambda: started.append(id))
+
+def test_priority_order():
+    started = []
+
+    submit(started, 1, priority = 0, order = 1)
+    submit(started, 2, priority = 1, order = 3)
+    submit(started, 3, priority = 1, order = 2)
+
+    DownloadScheduler.schedule()
+
+    # 优先级高的先启动，优先级相同时按添加顺序
+    assert started == [3, 2]
+
+    DownloadScheduler.remove(3)
+
+    assert started == [3, 2, 1]
+
+def test_max_download_count():
+    started = []
+
+    for id in range(5):
+        submit(started, id, order = id)
+
+    DownloadScheduler.schedule()
+
+    assert started == [0, 1]
+    assert DownloadScheduler.running_set == {0, 1}
+
+    # 手动开始的任务同样占用位置
+    DownloadScheduler.remove(0)
+    DownloadScheduler.mark_running(4)
+    DownloadScheduler.schedule()
+
+    assert started == [0, 1, 2]
+    assert len(DownloadScheduler.running_set) == 3
+
+    DownloadScheduler.remove(1)
+
+    assert started == [0, 1, 2]
+
+    DownloadScheduler.remove(2)
+
+    assert started == [0, 1, 2, 3]
+
+def test_connection_per_host():
+    stop_event = threading.Event()
+
+    assert DownloadScheduler.acquire_connection("https://a.example.com/1.m4s", stop_event)
+    assert DownloadScheduler.acquire_connection("https://a.example.com/2.m4s", stop_event)
+
+    # 其他主机不受影响
+    assert DownloadScheduler.acquire_connection("https://b.example.com/1.m4s", stop_event)
+
+    result = []
+    waiter = threading.Thread(target = lambda: result.append(DownloadScheduler.acquire_connection("https://a.example.com/3.m4s", stop_event)))
+    waiter.start()
+
+    waiter.join(0.2)
+    assert waiter.is_alive()
+
+    # 释放连接后等待的线程获得连接
+    DownloadScheduler.release_connection("https://a.example.com/1.m4s")
+
+    waiter.join(2)
+    assert result == [True]
+    assert DownloadScheduler.host_connection_dict == {"a.example.com": 2, "b.example.com": 1}
+
+def test_connection_wait_stopped():
+    stop_event = threading.Event()
+
+    for index in range(2):
+        DownloadScheduler.acquire_connection("https://a.example.com/1.m4s", stop_event)
+
+    stop_event.set()
+
+    # 任务停止后放弃等待
+    assert not DownloadScheduler.acquire_connection("https://a.example.com/1.m4s", stop_event)
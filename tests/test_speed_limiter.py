@@ -0,0 +1,41 @@
+import pytest
+
+from utils.config import Config
+from utils.common.rate_limit import SpeedLimiter
+
+@pytest.fixture(autouse = True)
+def reset_speed_limiter(monkeypatch):
+    monkeypatch.setattr(Config.Download, "enable_speed_limit", True)
+    monkeypatch.setattr(Config.Download, "speed_mbps", 4)
+
+    SpeedLimiter.bucket_dict.clear()
+    SpeedLimiter.active_dict.clear()
+
+    yield
+
+    SpeedLimiter.bucket_dict.clear()
+    SpeedLimiter.active_dict.clear()
+
+def test_share_per_task():
+    rate = 4 * 1024 * 1024
+
+    assert SpeedLimiter.get_bucket(1).max_rate == rate
+
+    # 同一任务的多个线程共用一个令牌桶，不会占用更多的带宽
+    for index in range(8):
+        SpeedLimiter.get_bucket(1)
+
+    assert SpeedLimiter.get_bucket(2).max_rate == rate / 2
+    assert SpeedLimiter.get_bucket(1).max_rate == rate / 2
+
+def test_inactive_task_released(monkeypatch):
+    rate = 4 * 1024 * 1024
+
+    SpeedLimiter.get_bucket(1)
+    SpeedLimiter.get_bucket(2)
+
+    # 长时间没有下载数据的任务让出份额
+    SpeedLimiter.active_dict[2] -= SpeedLimiter.active_time + 1
+
+    assert SpeedLimiter.get_bucket(1).max_rate == rate
+    assert 2 not in SpeedLimiter.bucket_dict